@@ -0,0 +1,109 @@
+# app/backfill.py
+# Build a newsletter for every slate in a date range in one process
+
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterable, Iterator
+
+from app.emailer import prepare_email_context, render_newsletter
+from app.models import Game, clear_teams
+from app.narrative import match_and_summarize
+from app.pitchers import apply_pitcher_stats, fetch_game_logs, stats_as_of
+from app.schedule import annotate_game, iter_schedule_slates
+from app.standings import fetch_team_meta
+
+log = logging.getLogger("mlb.backfill")
+
+# Slates per standings/pitcher-stats batch; bounds how many days are held at once
+WINDOW_DAYS = int(os.getenv("BACKFILL_WINDOW_DAYS", "7"))
+
+
+def _render_day(job: tuple) -> str:
+    """Worker-process entry point: render one day's HTML and write it out."""
+    day, games, out_path = job
+    ctx = prepare_email_context(games, day)
+    html = render_newsletter(ctx)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return out_path
+
+
+def _windows(slates: Iterable[tuple[str, list[dict]]], size: int) -> Iterator[list[tuple[date, list[dict]]]]:
+    """Group streamed (date, raw games) slates into lists of `size` non-empty days."""
+    window = []
+    for day, games in slates:
+        if games:
+            window.append((date.fromisoformat(day), games))
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def _annotated(window, threads: ThreadPoolExecutor, logs: dict) -> Iterator[tuple[date, list[Game]]]:
+    """
+    Annotate one window as the nightly run would have seen each slate:
+    standings as of the night before, and pitcher lines rebuilt from the
+    season's game logs up to that night (stats_as_of). Each slate belongs
+    to the season of its own date, so a range across the winter switches
+    seasons mid-way. One batched fetch per season covers starters not seen
+    in earlier windows (`logs` carries them, {season: {pitcher: log}}).
+    """
+    metas = threads.map(lambda d: fetch_team_meta(d.year, as_of=d - timedelta(days=1)), [d for d, _ in window])
+    days = [(day, [annotate_game(g, meta) for g in raw]) for (day, raw), meta in zip(window, metas)]
+    for season in sorted({day.year for day, _ in days}):
+        season_logs = logs.setdefault(season, {})
+        ids = {
+            pid for day, games in days if day.year == season
+            for g in games for pid in (g.probable_home_id, g.probable_away_id) if pid
+        }
+        missing = ids - set(season_logs)
+        if missing:
+            season_logs.update(fetch_game_logs(missing, season))
+    for day, games in days:
+        season_logs = logs[day.year]
+        day_ids = {pid for g in games for pid in (g.probable_home_id, g.probable_away_id) if pid}
+        apply_pitcher_stats(games, {pid: stats_as_of(season_logs.get(pid, []), day) for pid in day_ids})
+        match_and_summarize(games, [])
+        yield day, games
+
+
+def run_backfill(start: date, end: date, out_dir: str = "backfill", workers: int | None = None) -> list[str]:
+    """
+    Render newsletter_<date>.html for every US slate from start to end.
+
+    One schedule call covers the whole range, parsed as it streams in
+    (app.schedule.iter_schedule_slates); slates flow through in windows of
+    BACKFILL_WINDOW_DAYS, each with its own batched `people` call for new
+    starters. Standings, pitcher ERA/WHIP and recent form are all taken as
+    of the night before each slate (what the nightly run would have seen),
+    for the season the slate's date falls in. Narratives use the deterministic
+    fallback: Reuters only serves current previews. Rendering fans out to
+    worker processes with a bounded queue, so memory stays flat however
+    long the range.
+    """
+    if end < start:
+        raise ValueError(f"--to ({end}) is before --from ({start})")
+    workers = workers or int(os.getenv("BACKFILL_WORKERS", "0")) or os.cpu_count() or 1
+    clear_teams()
+
+    log.info(f"Backfill {start} → {end}: streaming schedule in one call…")
+    os.makedirs(out_dir, exist_ok=True)
+    written: list[str] = []
+    pending: deque = deque()
+    logs: dict = {}
+    with ThreadPoolExecutor(max_workers=8) as threads, ProcessPoolExecutor(max_workers=workers) as procs:
+        for window in _windows(iter_schedule_slates(start, end), WINDOW_DAYS):
+            for day, games in _annotated(window, threads, logs):
+                out_path = os.path.join(out_dir, f"newsletter_{day.isoformat()}.html")
+                pending.append(procs.submit(_render_day, (day, games, out_path)))
+            while len(pending) > workers * 2:
+                written.append(pending.popleft().result())
+        written.extend(f.result() for f in pending)
+    starters = sum(len(season_logs) for season_logs in logs.values())
+    log.info(f"Backfill wrote {len(written)} newsletter(s) to {out_dir}/ ({starters} starters)")
+    return written
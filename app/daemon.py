@@ -0,0 +1,170 @@
+# app/daemon.py
+# Long-running service mode: one warm process that refreshes the newsletter
+# ahead of each game window and serves the latest preview over HTTP.
+#
+#   python main.py --daemon            # http://127.0.0.1:8787/ and /healthz
+#
+# The HTTP session, SQLite caches, OpenAI client and compiled templates all
+# live at module level, so every refresh after the first skips that setup.
+# Refreshes run incrementally (see app.incremental): the first run of a
+# slate sends the newsletter, later ones only update the preview (and the
+# lineup-changes email when INCREMENTAL_NOTIFY=1).
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytz
+
+from app import replay
+from app.models import Game
+
+log = logging.getLogger("mlb.daemon")
+
+HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+PORT = int(os.getenv("DAEMON_PORT", "8787"))
+# Minutes before each first pitch to refresh at (T-3h and T-30m by default)
+LEADS_MIN = tuple(int(m) for m in os.getenv("DAEMON_LEADS_MIN", "180,30").split(",") if m.strip())
+# Refreshes closer together than this are merged into one
+MERGE_MIN = float(os.getenv("DAEMON_MERGE_MIN", "20"))
+# Daily run for the next slate, in MYT (the cron slot of newsletter.yml)
+DAILY_AT = os.getenv("DAEMON_DAILY_AT", "22:00")
+TZ_MYT = pytz.timezone("Asia/Kuala_Lumpur")
+
+
+class _State:
+    """Latest refresh, shared with the HTTP handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.html: str | None = None
+        self.last_run: datetime | None = None
+        self.last_error: str | None = None
+        self.next_run: datetime | None = None
+        self.games = 0
+        self.runs = 0
+
+    def health(self) -> dict:
+        with self.lock:
+            return {
+                "ok": self.last_error is None,
+                "runs": self.runs,
+                "games": self.games,
+                "last_run": self.last_run.isoformat() if self.last_run else None,
+                "next_run": self.next_run.isoformat() if self.next_run else None,
+                "last_error": self.last_error,
+            }
+
+
+def _handler(state: _State):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/healthz":
+                self._send(200, "application/json", json.dumps(state.health()))
+            elif path in ("/", "/preview"):
+                with state.lock:
+                    html = state.html
+                if html is None:
+                    self._send(503, "text/plain; charset=utf-8", "No newsletter rendered yet")
+                else:
+                    self._send(200, "text/html; charset=utf-8", html)
+            else:
+                self._send(404, "text/plain; charset=utf-8", "Not found")
+
+        def _send(self, code: int, ctype: str, body: str):
+            data = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            log.debug("http: " + fmt % args)
+
+    return Handler
+
+
+def refresh_times(games: list[Game], leads_min=LEADS_MIN, merge_min: float = MERGE_MIN) -> list[datetime]:
+    """
+    UTC refresh instants: each lead before each distinct first pitch,
+    sorted, with instants within `merge_min` of the previous one dropped.
+    """
+    starts = set()
+    for g in games:
+        iso = g.get("game_iso") or g.get("gameDate")
+        if not iso:
+            continue
+        try:
+            starts.add(datetime.fromisoformat(iso.replace("Z", "+00:00")).astimezone(timezone.utc))
+        except ValueError:
+            continue
+    times = sorted(s - timedelta(minutes=m) for s in starts for m in leads_min)
+    merged: list[datetime] = []
+    for t in times:
+        if not merged or (t - merged[-1]) >= timedelta(minutes=merge_min):
+            merged.append(t)
+    return merged
+
+
+def next_daily_run(now: datetime, daily_at: str = DAILY_AT) -> datetime:
+    """Next DAILY_AT wall-clock time in MYT, as UTC."""
+    hh, mm = (int(x) for x in daily_at.split(":"))
+    local = now.astimezone(TZ_MYT)
+    run = TZ_MYT.localize(datetime(local.year, local.month, local.day, hh, mm))
+    if run <= local:
+        run = TZ_MYT.localize(datetime(local.year, local.month, local.day, hh, mm) + timedelta(days=1))
+    return run.astimezone(timezone.utc)
+
+
+def next_run_after(now: datetime, games: list[Game]) -> datetime:
+    """Earliest upcoming game-window refresh, else the next daily slot."""
+    daily = next_daily_run(now)
+    upcoming = [t for t in refresh_times(games) if t > now]
+    return min(upcoming[0], daily) if upcoming else daily
+
+
+def run_daemon(refresh, host: str = HOST, port: int = PORT, stop: threading.Event | None = None):
+    """
+    Serve the preview and loop forever: run `refresh()` (→ dict with
+    "html" and "games"), then sleep until the next scheduled refresh.
+    A failing refresh is logged and retried at the next slot.
+    """
+    state = _State()
+    stop = stop or threading.Event()
+    server = ThreadingHTTPServer((host, port), _handler(state))
+    threading.Thread(target=server.serve_forever, name="preview-http", daemon=True).start()
+    log.info(f"Daemon: serving preview on http://{host}:{server.server_address[1]}/")
+
+    games: list[Game] = []
+    try:
+        while not stop.is_set():
+            try:
+                result = refresh()
+                games = result.get("games") or []
+                with state.lock:
+                    state.html = result.get("html")
+                    state.games = len(games)
+                    state.last_error = None
+            except Exception as e:
+                log.exception(f"Daemon: refresh failed: {e}")
+                with state.lock:
+                    state.last_error = str(e)
+            now = replay.now(timezone.utc)
+            nxt = next_run_after(now, games)
+            with state.lock:
+                state.last_run = now
+                state.runs += 1
+                state.next_run = nxt
+            log.info(f"Daemon: next refresh at {nxt.astimezone(TZ_MYT):%a %d %b %H:%M} MYT")
+            stop.wait(max(0.0, (nxt - now).total_seconds()))
+    except KeyboardInterrupt:
+        log.info("Daemon: interrupted, shutting down")
+    finally:
+        server.shutdown()
+        server.server_close()
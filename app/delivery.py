@@ -0,0 +1,229 @@
+# app/delivery.py
+# Bulk SMTP delivery over one persistent authenticated connection, with
+# batched envelopes, retries on transient (4xx) replies and a delivery
+# status per recipient.
+#
+# Works against a local debugging server too, e.g.
+#   python -m aiosmtpd -n -l localhost:1025
+#   SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=0 python main.py
+
+import logging
+import os
+import smtplib
+import time
+from dataclasses import dataclass
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+
+log = logging.getLogger("mlb.delivery")
+
+
+@dataclass
+class Message:
+    """One personalised message for one recipient."""
+    recipient: str
+    subject: str
+    html: str
+
+
+@dataclass
+class DeliveryStatus:
+    recipient: str
+    ok: bool
+    code: int | None = None
+    error: str | None = None
+    attempts: int = 0
+
+
+class DeliveryError(RuntimeError):
+    """Not a single recipient of a send could be delivered to."""
+
+
+def _is_transient(code: int | None) -> bool:
+    return code is not None and 400 <= code < 500
+
+
+class SmtpDelivery:
+    """
+    Context manager around a single SMTP session:
+
+        with SmtpDelivery.from_env() as smtp:
+            statuses = smtp.send_bulk(subject, html, recipients)
+
+    The connection is reopened transparently after `max_per_connection`
+    messages (providers cap this) or if the server drops it.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        user: str | None = None,
+        password: str | None = None,
+        sender: str | None = None,
+        starttls: bool = True,
+        retries: int = 3,
+        retry_backoff: float = 2.0,
+        envelope_size: int = 50,
+        max_per_connection: int = 100,
+        timeout: float = 30,
+    ):
+        if not host:
+            raise ValueError("SMTP host is not configured (SMTP_HOST)")
+        self.host, self.port = host, port
+        self.user, self.password = user, password
+        self.sender = sender or user
+        if not self.sender:
+            raise ValueError("No sender address (SMTP_FROM or SMTP_USER)")
+        self.starttls = starttls
+        self.retries = max(1, retries)
+        self.retry_backoff = retry_backoff
+        self.envelope_size = max(1, envelope_size)
+        self.max_per_connection = max(1, max_per_connection)
+        self.timeout = timeout
+        self._conn: smtplib.SMTP | None = None
+        self._sent_on_conn = 0
+
+    @classmethod
+    def from_env(cls) -> "SmtpDelivery":
+        return cls(
+            host=os.getenv("SMTP_HOST"),
+            port=int(os.getenv("SMTP_PORT") or "587"),
+            user=os.getenv("SMTP_USER"),
+            password=os.getenv("SMTP_PASS"),
+            sender=os.getenv("SMTP_FROM") or os.getenv("SMTP_USER"),
+            starttls=os.getenv("SMTP_STARTTLS", "1") != "0",
+            retries=int(os.getenv("SMTP_RETRIES", "3")),
+            envelope_size=int(os.getenv("SMTP_ENVELOPE_SIZE", "50")),
+            max_per_connection=int(os.getenv("SMTP_MAX_PER_CONNECTION", "100")),
+        )
+
+    # --- connection handling ---
+    def __enter__(self):
+        self._connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        self.close()
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.starttls:
+            conn.starttls()  # raises if the server does not offer it: never log in over cleartext
+            conn.ehlo()
+        if self.user and self.password:
+            conn.login(self.user, self.password)
+        self._conn = conn
+        self._sent_on_conn = 0
+        log.debug(f"SMTP connected to {self.host}:{self.port}")
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._conn = None
+
+    def _ready(self) -> smtplib.SMTP:
+        if self._conn is None or self._sent_on_conn >= self.max_per_connection:
+            self._connect()
+        return self._conn
+
+    # --- sending ---
+    def _mime(self, subject: str, html: str, to_header: str) -> str:
+        msg = MIMEText(html, "html", "utf-8")
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = to_header
+        msg["Date"] = formatdate(localtime=True)
+        msg["Message-ID"] = make_msgid()
+        return msg.as_string()
+
+    def _send_envelope(self, rcpts: list[str], payload: str) -> dict[str, DeliveryStatus]:
+        """Send one envelope, retrying transient failures; returns status per recipient."""
+        status = {r: DeliveryStatus(r, ok=False) for r in rcpts}
+        pending = list(rcpts)
+        for attempt in range(1, self.retries + 1):
+            for r in pending:
+                status[r].attempts = attempt
+            retry: list[str] = []
+            try:
+                refused = self._ready().sendmail(self.sender, pending, payload)
+                self._sent_on_conn += 1
+            except smtplib.SMTPRecipientsRefused as e:
+                refused = e.recipients
+            except smtplib.SMTPServerDisconnected as e:
+                self._conn = None
+                refused = {r: (None, str(e)) for r in pending}
+                retry = pending
+            except smtplib.SMTPResponseException as e:
+                self._reset()
+                refused = {r: (e.smtp_code, e.smtp_error) for r in pending}
+            except OSError as e:
+                self._conn = None
+                refused = {r: (None, str(e)) for r in pending}
+                retry = pending
+
+            for r in pending:
+                if r not in refused:
+                    status[r].ok, status[r].code, status[r].error = True, 250, None
+                    continue
+                code, err = refused[r]
+                status[r].code = code
+                status[r].error = err.decode(errors="replace") if isinstance(err, bytes) else str(err)
+                if _is_transient(code) and r not in retry:
+                    retry.append(r)
+            pending = retry
+            if not pending:
+                break
+            if attempt < self.retries:
+                delay = self.retry_backoff * 2 ** (attempt - 1)
+                log.warning(f"Transient SMTP failure for {len(pending)} recipient(s); retrying in {delay:.0f}s")
+                time.sleep(delay)
+        return status
+
+    def _reset(self):
+        try:
+            if self._conn is not None:
+                self._conn.rset()
+        except (smtplib.SMTPException, OSError):
+            self._conn = None
+
+    def send_bulk(self, subject: str, html: str, recipients: list[str]) -> list[DeliveryStatus]:
+        """
+        Same message to many recipients: envelopes of up to `envelope_size`
+        RCPTs each, with an undisclosed To header so nobody sees the list.
+        """
+        payload = self._mime(subject, html, "undisclosed-recipients:;")
+        out: list[DeliveryStatus] = []
+        for i in range(0, len(recipients), self.envelope_size):
+            batch = recipients[i:i + self.envelope_size]
+            out.extend(self._send_envelope(batch, payload).values())
+        return out
+
+    def send(self, messages: list[Message]) -> list[DeliveryStatus]:
+        """Personalised messages, one envelope each, all over the same connection."""
+        out = []
+        for m in messages:
+            payload = self._mime(m.subject, m.html, m.recipient)
+            out.extend(self._send_envelope([m.recipient], payload).values())
+        return out
+
+
+def log_report(statuses: list[DeliveryStatus]) -> int:
+    """
+    Log per-recipient failures and a summary; returns the number delivered.
+    Raises DeliveryError when every recipient failed, so the run fails as
+    it did when sendmail raised.
+    """
+    ok = sum(1 for s in statuses if s.ok)
+    for s in statuses:
+        if not s.ok:
+            log.error(f"Delivery to {s.recipient} failed after {s.attempts} attempt(s): {s.code} {s.error}")
+    log.info(f"Delivered {ok}/{len(statuses)} message(s)")
+    if statuses and not ok:
+        raise DeliveryError(f"All {len(statuses)} deliveries failed")
+    return ok
@@ -0,0 +1,77 @@
+# app/editions.py
+# Render many personalised editions (timezone, contender-only, favourite
+# teams) from one annotated game list. Game cards are rendered once per
+# (game, timezone, section) and shared by every edition that shows them.
+
+import json
+import logging
+from dataclasses import dataclass, field
+
+import pytz
+
+from app.emailer import render_card, render_template
+from app.models import Game
+from app.schedule import to_local_str
+from app.team_index import resolve_team
+
+log = logging.getLogger("mlb.editions")
+
+
+@dataclass
+class Edition:
+    name: str
+    timezone: str = "Asia/Kuala_Lumpur"
+    tz_label: str | None = "MYT"        # shown after kickoff times; None = zone abbreviation
+    contender_only: bool = False
+    teams: list[str] = field(default_factory=list)   # favourite teams (any alias); empty = all
+    recipients: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        # Canonical full names so "Yankees", "NYY" and "New York Yankees" all match
+        self.teams = [resolve_team(t) or t for t in self.teams]
+
+
+def load_editions(path: str) -> list[Edition]:
+    """Read a JSON list of edition objects (keys as in Edition)."""
+    with open(path, encoding="utf-8") as f:
+        return [Edition(**spec) for spec in json.load(f)]
+
+
+def _wants(edition: Edition, g: Game) -> bool:
+    if edition.contender_only and not g.is_contender:
+        return False
+    if edition.teams:
+        names = {resolve_team(g.home_name or ""), resolve_team(g.away_name or "")}
+        return any(t in names for t in edition.teams)
+    return True
+
+
+def render_editions(games: list[Game], editions: list[Edition], target_date: str) -> dict[str, str]:
+    """
+    Returns {edition name: html}. Kickoff strings and card fragments are
+    computed once per timezone and reused, so the per-edition cost is just
+    filtering and the outer template.
+    """
+    times: dict[tuple, str] = {}
+    cards: dict[tuple, object] = {}
+
+    def _card(idx: int, g: Game, ed: Edition, contender: bool):
+        tz_key = (ed.timezone, ed.tz_label)
+        if (idx, tz_key) not in times:
+            times[(idx, tz_key)] = to_local_str(g.game_iso, pytz.timezone(ed.timezone), ed.tz_label)
+        key = (idx, tz_key, contender)
+        if key not in cards:
+            cards[key] = render_card(g, contender, times[(idx, tz_key)])
+        return cards[key]
+
+    out = {}
+    for ed in editions:
+        picked = [(i, g) for i, g in enumerate(games) if _wants(ed, g)]
+        out[ed.name] = render_template(
+            "email.html",
+            target_date=target_date,
+            contender_cards=[_card(i, g, ed, True) for i, g in picked if g.is_contender],
+            other_cards=[_card(i, g, ed, False) for i, g in picked if not g.is_contender],
+        )
+    log.info(f"Rendered {len(out)} edition(s) from {len(cards)} shared card fragment(s)")
+    return out
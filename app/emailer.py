@@ -1,29 +1,61 @@
 #emailer.py
-import os
-import smtplib
-from email.mime.text import MIMEText
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from functools import lru_cache
 
-def render_template(template_name: str, **ctx) -> str:
-    env = Environment(
-        loader=FileSystemLoader("templates"),
-        autoescape=select_autoescape(["html", "xml"])
+@lru_cache(maxsize=None)
+def _env(template_dir: str = "templates"):
+    """One jinja2 Environment per process: templates are compiled once and kept.
+    jinja2 itself is imported on the first render, not at module load."""
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        autoescape=select_autoescape(["html", "xml"]),
+        auto_reload=False,
     )
-    tpl = env.get_template(template_name)
+
+def render_template(template_name: str, **ctx) -> str:
+    tpl = _env().get_template(template_name)
     return tpl.render(**ctx)
 
-def send_email(subject: str, html: str, recipients: list[str]):
-    host = os.getenv("SMTP_HOST")
-    port = int(os.getenv("SMTP_PORT", "587"))
-    user = os.getenv("SMTP_USER")
-    pwd  = os.getenv("SMTP_PASS")
-
-    msg = MIMEText(html, "html", "utf-8")
-    msg["Subject"] = subject
-    msg["From"] = user
-    msg["To"] = ", ".join(recipients)
-
-    with smtplib.SMTP(host, port) as s:
-        s.starttls()
-        s.login(user, pwd)
-        s.sendmail(user, recipients, msg.as_string())
+def render_card(g, contender: bool, time_str: str | None = None):
+    """One game card (Markup) from templates/_game_card.html."""
+    return _env().get_template("_game_card.html").module.card(g, contender, time_str)
+
+def render_newsletter(ctx: dict) -> str:
+    """Render email.html from prepare_email_context() output."""
+    return render_template(
+        "email.html",
+        **ctx,
+        contender_cards=[render_card(g, True) for g in ctx["contender_games"]],
+        other_cards=[render_card(g, False) for g in ctx["other_games"]],
+    )
+
+def prepare_email_context(games, myt_date):
+    """
+    Pass the Game records (app.models) straight to the template.
+    Splits by contender flag but does not rename keys.
+    """
+    contender_games = [g for g in games if g.is_contender]
+    other_games = [g for g in games if not g.is_contender]
+
+    target_date_str = myt_date.strftime("%a %d %b %Y")
+
+    return {
+        "target_date": target_date_str,
+        "contender_games": contender_games,
+        "other_games": other_games,
+    }
+
+def send_email(subject: str, html: str, recipients: list[str], smtp=None):
+    """
+    Send one newsletter to every recipient via app.delivery: batched
+    envelopes over one connection, undisclosed To header. Pass an open
+    SmtpDelivery to share its connection across several sends.
+    Returns the per-recipient DeliveryStatus list.
+    """
+    from app.delivery import SmtpDelivery
+
+    if smtp is not None:
+        return smtp.send_bulk(subject, html, recipients)
+    with SmtpDelivery.from_env() as conn:
+        return conn.send_bulk(subject, html, recipients)
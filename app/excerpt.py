@@ -0,0 +1,97 @@
+# app/excerpt.py
+# Extractive pre-pass for summarization: keep the article paragraphs that
+# talk about this matchup (its two teams, the probable starters, pitching
+# stats) within a token budget, instead of whatever the first 1,500
+# characters happen to hold.
+
+import os
+import re
+
+from app.team_index import iter_mentions
+
+# Prompt budget for the article text (~4 characters per token, as narrative estimates)
+EXCERPT_TOKENS = int(os.getenv("OPENAI_EXCERPT_TOKENS", "250"))
+CHARS_PER_TOKEN = 4
+
+TEAM_WEIGHT = 3.0
+PITCHER_WEIGHT = 4.0
+STAT_WEIGHT = 1.0
+LEAD_BONUS = 1.0      # the lede usually sets up the matchup
+MAX_STAT_HITS = 4     # so a box-score dump does not outrank the preview paragraphs
+
+STAT_RE = re.compile(
+    r"\b(ERA|WHIP|strikeouts?|struck out|walks?|innings?|starts?|starter|no-hitter|shutout|"
+    r"bullpen|rotation|injured list|record|streak|won|lost|wins?|losses|games? back|standings|"
+    r"wild card|division|homers?|home runs?|RBIs?|batting|\d-\d)\b",
+    re.I,
+)
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'A-Z0-9])")
+
+
+def _pitcher_patterns(pitchers) -> list[re.Pattern]:
+    """Full name or surname of each named probable starter ("TBD" is skipped)."""
+    out = []
+    for name in pitchers or ():
+        if not name or name == "TBD":
+            continue
+        last = name.split()[-1]
+        out.append(re.compile(rf"\b({re.escape(name)}|{re.escape(last)})\b", re.I))
+    return out
+
+
+def score(text: str, teams, pitcher_res: list[re.Pattern]) -> float:
+    """Relevance of one paragraph or sentence to the matchup."""
+    teams = {t for t in teams or () if t}
+    s = 0.0
+    if teams:
+        s += TEAM_WEIGHT * len({full for _, full in iter_mentions(text) if full in teams})
+    s += PITCHER_WEIGHT * sum(1 for p in pitcher_res if p.search(text))
+    s += STAT_WEIGHT * min(MAX_STAT_HITS, len(STAT_RE.findall(text)))
+    return s
+
+
+def _paragraphs(text: str) -> list[str]:
+    return [p.strip() for p in (text or "").split("\n\n") if p.strip()]
+
+
+def select_excerpt(text: str, teams=(), pitchers=(), budget_tokens: int = EXCERPT_TOKENS) -> str:
+    """
+    The highest-scoring paragraphs that fit in `budget_tokens`, joined in
+    article order. Paragraphs with nothing relevant are only used when no
+    paragraph scores; a lone paragraph over budget is cut to fit.
+    """
+    paras = _paragraphs(text)
+    budget = budget_tokens * CHARS_PER_TOKEN
+    if not paras:
+        return ""
+    pitcher_res = _pitcher_patterns(pitchers)
+    raw = [score(p, teams, pitcher_res) for p in paras]
+    ranked = sorted(
+        (i for i in range(len(paras)) if raw[i] > 0),
+        key=lambda i: (-(raw[i] + (LEAD_BONUS if i == 0 else 0.0)), i),
+    ) or list(range(len(paras)))
+
+    keep, used = [], 0
+    for i in ranked:
+        size = len(paras[i]) + (2 if keep else 0)
+        if used + size <= budget:
+            keep.append(i)
+            used += size
+    if not keep:
+        return paras[ranked[0]][:budget]
+    return "\n\n".join(paras[i] for i in sorted(keep))
+
+
+def key_sentences(text: str, teams=(), pitchers=(), n: int = 2) -> str:
+    """
+    No-API summary: the `n` most relevant sentences of the article's best
+    paragraphs, in article order (the first sentences when nothing scores).
+    """
+    pitcher_res = _pitcher_patterns(pitchers)
+    excerpt = select_excerpt(text, teams, pitchers)
+    sentences = [s.strip() for p in _paragraphs(excerpt) for s in SENTENCE_RE.split(p) if s.strip()]
+    if not sentences:
+        return ""
+    ranked = sorted(range(len(sentences)), key=lambda i: (-score(sentences[i], teams, pitcher_res), i))
+    picked = sorted(ranked[:n])
+    return " ".join(s if s[-1] in ".!?\"'" else s + "." for s in (sentences[i] for i in picked))
@@ -0,0 +1,165 @@
+# app/html_extract.py
+# Targeted streaming extractors for Reuters pages. Instead of building a full
+# BeautifulSoup tree of a multi-hundred-KB page, these HTMLParser subclasses
+# only track the handful of data-testid nodes we read and stop feeding as
+# soon as they have what they need. reuters_flm falls back to BeautifulSoup
+# when they come back empty (e.g. after a markup change).
+
+from html.parser import HTMLParser
+
+CHUNK_SIZE = 32 * 1024
+BODY_CLASS_PREFIX = "article-body__content"
+
+
+class _Done(Exception):
+    """Raised from a handler to stop feeding the rest of the document."""
+
+
+def _attr(attrs: list, name: str) -> str | None:
+    for k, v in attrs:
+        if k == name:
+            return v
+    return None
+
+
+def _feed(parser: HTMLParser, html: str):
+    try:
+        for i in range(0, len(html), CHUNK_SIZE):
+            parser.feed(html[i:i + CHUNK_SIZE])
+        parser.close()
+    except _Done:
+        pass
+
+
+class ArticleBodyParser(HTMLParser):
+    """
+    Collects the text of every div[data-testid^="paragraph-"] inside the
+    div.article-body__content__* container, then stops at its closing tag.
+    Text is joined like BeautifulSoup's get_text(" ", strip=True).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found_body = False
+        self.paragraphs: list[str] = []
+        self._body_depth = 0      # open divs inside the body container
+        self._para_depth = 0      # open divs inside the current paragraph
+        self._chunks: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "div":
+            return
+        if not self._body_depth:
+            classes = (_attr(attrs, "class") or "").split()
+            if any(c.startswith(BODY_CLASS_PREFIX) for c in classes):
+                self.found_body = True
+                self._body_depth = 1
+            return
+        self._body_depth += 1
+        if self._para_depth:
+            self._para_depth += 1
+        elif (_attr(attrs, "data-testid") or "").startswith("paragraph-"):
+            self._para_depth = 1
+            self._chunks = []
+
+    def handle_endtag(self, tag):
+        if tag != "div" or not self._body_depth:
+            return
+        if self._para_depth:
+            self._para_depth -= 1
+            if not self._para_depth:
+                self.paragraphs.append(" ".join(self._chunks))
+        self._body_depth -= 1
+        if not self._body_depth:
+            raise _Done()
+
+    def handle_data(self, data):
+        if self._para_depth:
+            text = data.strip()
+            if text:
+                self._chunks.append(text)
+
+
+class StoryCardParser(HTMLParser):
+    """
+    Reads li[data-testid="StoryCard"] cards: the TitleLink href and text,
+    the first <time datetime=…> and the Description paragraph. Stops once
+    `accept(card)` has returned True `limit` times.
+    """
+
+    def __init__(self, accept=None, limit: int | None = None):
+        super().__init__(convert_charrefs=True)
+        self.cards: list[dict] = []
+        self.seen = 0             # StoryCards encountered, accepted or not
+        self._accept = accept or (lambda card: True)
+        self._limit = limit
+        self._li_depth = 0
+        self._card: dict | None = None
+        self._capture: str | None = None   # "title" | "desc" while inside those nodes
+        self._capture_tag = None
+        self._capture_depth = 0
+        self._chunks: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._card is None:
+            if tag == "li" and _attr(attrs, "data-testid") == "StoryCard":
+                self._card = {"href": None, "title": "", "datetime": None, "desc": ""}
+                self._li_depth = 1
+                self.seen += 1
+            return
+        if tag == "li":
+            self._li_depth += 1
+        if self._capture:
+            if tag == self._capture_tag:
+                self._capture_depth += 1
+            return
+        testid = _attr(attrs, "data-testid")
+        if tag == "a" and testid == "TitleLink" and self._card["href"] is None:
+            self._card["href"] = _attr(attrs, "href")
+            self._start_capture("title", tag)
+        elif tag == "time" and self._card["datetime"] is None:
+            self._card["datetime"] = _attr(attrs, "datetime")
+        elif tag == "p" and testid == "Description" and not self._card["desc"]:
+            self._start_capture("desc", tag)
+
+    def _start_capture(self, field, tag):
+        self._capture, self._capture_tag, self._capture_depth = field, tag, 1
+        self._chunks = []
+
+    def handle_endtag(self, tag):
+        if self._card is None:
+            return
+        if self._capture and tag == self._capture_tag:
+            self._capture_depth -= 1
+            if not self._capture_depth:
+                # BeautifulSoup get_text(strip=True): stripped strings, no separator
+                self._card[self._capture] = "".join(self._chunks)
+                self._capture = None
+        if tag == "li":
+            self._li_depth -= 1
+            if not self._li_depth:
+                card, self._card, self._capture = self._card, None, None
+                if card["href"] and self._accept(card):
+                    self.cards.append(card)
+                    if self._limit is not None and len(self.cards) >= self._limit:
+                        raise _Done()
+
+    def handle_data(self, data):
+        if self._capture:
+            text = data.strip()
+            if text:
+                self._chunks.append(text)
+
+
+def extract_paragraphs(html: str) -> tuple[bool, list[str]]:
+    """(body container found?, paragraph texts) for a Reuters article page."""
+    parser = ArticleBodyParser()
+    _feed(parser, html or "")
+    return parser.found_body, parser.paragraphs
+
+
+def extract_story_cards(html: str, accept=None, limit: int | None = None) -> tuple[int, list[dict]]:
+    """(StoryCards seen, accepted cards) for a Reuters author page."""
+    parser = StoryCardParser(accept=accept, limit=limit)
+    _feed(parser, html or "")
+    return parser.seen, parser.cards
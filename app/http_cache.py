@@ -0,0 +1,198 @@
+# app/http_cache.py
+# Persistent SQLite cache for GET responses (StatsAPI + Reuters)
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator
+from urllib.parse import urlencode
+
+from app import http_client, replay, trace
+
+log = logging.getLogger("mlb.http_cache")
+
+CACHE_PATH = os.getenv("HTTP_CACHE_PATH", os.path.join(".cache", "http_cache.sqlite"))
+CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") != "0"
+MAX_AGE_DAYS = float(os.getenv("HTTP_CACHE_MAX_AGE_DAYS", "45"))  # rows older than this are pruned
+STREAM_CHUNK = int(os.getenv("HTTP_STREAM_CHUNK", str(64 * 1024)))  # characters per iter_text chunk
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+
+def _db() -> sqlite3.Connection:
+    """Open (once) the shared cache DB; callers must hold _lock."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key           TEXT PRIMARY KEY,
+                body          TEXT NOT NULL,
+                etag          TEXT,
+                last_modified TEXT,
+                fetched_at    REAL NOT NULL
+            )
+            """
+        )
+        _conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - MAX_AGE_DAYS * 86400,))
+        _conn.commit()
+    return _conn
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    """URL plus sorted query params, so equivalent requests share an entry."""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+
+def _lookup(key: str):
+    with _lock:
+        return _db().execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+
+def _store(key: str, body: str, etag: str | None, last_modified: str | None):
+    with _lock:
+        db = _db()
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (key, body, etag, last_modified, time.time()),
+        )
+        db.commit()
+
+
+def _touch(key: str):
+    with _lock:
+        db = _db()
+        db.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+        db.commit()
+
+
+def _request(url, params, headers, timeout, throttle):
+    if throttle is None:
+        return http_client.get(url, params=params, headers=headers, timeout=timeout)
+    with throttle():
+        return http_client.get(url, params=params, headers=headers, timeout=timeout)
+
+
+def get_text(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    ttl: float = 0.0,
+    timeout: float | None = None,
+    throttle=None,
+) -> str:
+    """
+    GET `url` and return the body text, served from the on-disk cache while
+    younger than `ttl` seconds. Stale entries are revalidated with
+    If-None-Match / If-Modified-Since when the server sent validators.
+    Network requests go through the shared pooled session (app/http_client);
+    `throttle`, if given, is a context-manager factory wrapped around each
+    network request only, so cache hits are never paced.
+    In replay mode the recorded body is returned and nothing else happens;
+    in record mode every body returned here is added to the archive.
+    """
+    t0 = time.perf_counter()
+    if replay.replaying():
+        text = replay.http_response(cache_key(url, params))
+        trace.record_http(url, None, len(text), "replay", time.perf_counter() - t0)
+        return text
+    text, status, cache_state = _fetch_text(url, params, headers, ttl, timeout, throttle)
+    trace.record_http(url, status, len(text), cache_state, time.perf_counter() - t0)
+    if replay.recording():
+        replay.record_http(cache_key(url, params), text)
+    return text
+
+
+def _fetch_text(url, params, headers, ttl, timeout, throttle) -> tuple[str, int | None, str]:
+    """(body, HTTP status or None when no request was made, cache outcome)."""
+    if not CACHE_ENABLED:
+        r = _request(url, params, headers, timeout, throttle)
+        r.raise_for_status()
+        return r.text, r.status_code, "bypass"
+
+    key = cache_key(url, params)
+    row = _lookup(key)
+    if row and time.time() - row[3] < ttl:
+        log.debug(f"cache hit: {key}")
+        return row[0], None, "hit"
+
+    req_headers = dict(headers or {})
+    if row:
+        if row[1]:
+            req_headers["If-None-Match"] = row[1]
+        if row[2]:
+            req_headers["If-Modified-Since"] = row[2]
+
+    r = _request(url, params, req_headers, timeout, throttle)
+    if r.status_code == 304 and row:
+        log.debug(f"cache revalidated: {key}")
+        _touch(key)
+        return row[0], r.status_code, "revalidated"
+    r.raise_for_status()
+    _store(key, r.text, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    log.debug(f"cache miss: {key}")
+    return r.text, r.status_code, "miss"
+
+
+def iter_text(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    ttl: float = 0.0,
+    timeout: float | None = None,
+    chunk_size: int = STREAM_CHUNK,
+) -> Iterator[str]:
+    """
+    get_text for large bodies: yields the body in chunks as it comes off the
+    socket instead of returning it whole. A fresh cache entry or a replayed
+    body is handed out in chunks of the same size, so consumers see one code
+    path. Streamed bodies are not written to the cache (holding them whole
+    is what streaming avoids); in record mode the archive needs the full
+    body, so it falls back to get_text.
+    """
+    from app.json_stream import text_chunks
+
+    if replay.replaying() or replay.recording():
+        yield from text_chunks(get_text(url, params=params, headers=headers, ttl=ttl, timeout=timeout), chunk_size)
+        return
+    t0 = time.perf_counter()
+    if CACHE_ENABLED:
+        row = _lookup(cache_key(url, params))
+        if row and time.time() - row[3] < ttl:
+            trace.record_http(url, None, len(row[0]), "hit", time.perf_counter() - t0)
+            yield from text_chunks(row[0], chunk_size)
+            return
+
+    r = http_client.get(url, params=params, headers=headers, timeout=timeout, stream=True)
+    size = 0
+    try:
+        r.raise_for_status()
+        r.encoding = r.encoding or "utf-8"
+        for chunk in r.iter_content(chunk_size=chunk_size, decode_unicode=True):
+            size += len(chunk)
+            yield chunk
+    finally:
+        r.close()
+        trace.record_http(url, r.status_code, size, "stream", time.perf_counter() - t0)
+
+
+def get_json(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    ttl: float = 0.0,
+    timeout: float | None = None,
+    throttle=None,
+) -> dict:
+    """Same as get_text, decoded as JSON."""
+    return json.loads(get_text(url, params=params, headers=headers, ttl=ttl, timeout=timeout, throttle=throttle))
@@ -0,0 +1,65 @@
+# app/http_client.py
+# One pooled keep-alive session shared by every fetcher. requests/urllib3
+# are imported when the session is first built, so cached, replayed and
+# store-only runs never load them.
+
+import os
+import threading
+from urllib.parse import urlsplit
+
+RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))      # sleeps 0.5s, 1s, 2s… between retries
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "8"))      # keep-alive connections per host
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "25"))
+
+# Read timeouts per host (seconds), overridable via env
+HOST_TIMEOUTS = {
+    "statsapi.mlb.com": float(os.getenv("HTTP_TIMEOUT_STATSAPI", "30")),
+    "www.reuters.com": float(os.getenv("HTTP_TIMEOUT_REUTERS", "20")),
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide requests.Session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=POOL_SIZE)
+            s = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+
+def timeout_for(url: str) -> tuple[float, float]:
+    """(connect, read) timeout for the URL's host."""
+    host = urlsplit(url).hostname or ""
+    return CONNECT_TIMEOUT, HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT)
+
+
+def get(url: str, params: dict | None = None, headers: dict | None = None, timeout=None, stream: bool = False):
+    """
+    GET through the shared session. Retries with backoff on connection errors
+    and 429/5xx (honouring Retry-After); the caller decides on raise_for_status.
+    With stream=True the body is left on the socket for iter_content.
+    """
+    return get_session().get(url, params=params, headers=headers, timeout=timeout or timeout_for(url), stream=stream)
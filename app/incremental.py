@@ -0,0 +1,112 @@
+# app/incremental.py
+# Per-game state of the last run, so a refresh later the same day only
+# re-fetches pitcher stats and re-summarizes games whose inputs changed.
+
+import json
+import logging
+import os
+
+from app.models import Game
+
+log = logging.getLogger("mlb.incremental")
+
+STATE_PATH = os.getenv("INCREMENTAL_STATE_PATH", os.path.join(".cache", "last_run.json"))
+STATE_VERSION = 1
+
+# Fields kept per game: enough to diff inputs and to restore outputs.
+_GAME_FIELDS = (
+    "away_name", "home_name", "probable_away_id", "probable_home_id",
+    "away_pitcher", "home_pitcher", "is_contender", "source", "narrative",
+)
+
+
+def load_state(us_date: str, path: str = STATE_PATH) -> dict | None:
+    """Last run's state if it was for the same US slate, else None."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("version") != STATE_VERSION or state.get("us_date") != us_date:
+        return None
+    return state
+
+
+def save_state(us_date: str, games: list[Game], stat_map: dict, path: str = STATE_PATH):
+    state = {
+        "version": STATE_VERSION,
+        "us_date": us_date,
+        "games": {str(g.get("gamePk")): {k: g.get(k) for k in _GAME_FIELDS} for g in games},
+        "pitchers": {str(pid): stats for pid, stats in stat_map.items()},
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def cached_pitcher_stats(state: dict | None) -> dict:
+    """{pitcher_id: {"ERA", "WHIP"}} from the last run (JSON keys back to int)."""
+    if not state:
+        return {}
+    return {int(pid): stats for pid, stats in state.get("pitchers", {}).items()}
+
+
+def previous_narratives(state: dict | None) -> dict:
+    """
+    {gamePk: {"source", "narrative", "is_contender", "probable_home_id",
+    "probable_away_id"}} for match_and_summarize.
+    """
+    if not state:
+        return {}
+    keys = ("source", "narrative", "is_contender", "probable_home_id", "probable_away_id")
+    return {
+        pk: {k: g.get(k) for k in keys}
+        for pk, g in state.get("games", {}).items()
+        if g.get("source") and g.get("narrative")
+    }
+
+
+def diff_games(state: dict | None, games: list[Game]) -> list[dict]:
+    """
+    Changes since the last run, one dict per game:
+    kind is "added", "removed", "pitchers" or "article".
+    """
+    if not state:
+        return []
+    prev = state.get("games", {})
+    changes = []
+    seen = set()
+    for g in games:
+        pk = str(g.get("gamePk"))
+        seen.add(pk)
+        old = prev.get(pk)
+        matchup = f"{g.get('away_name')} @ {g.get('home_name')}"
+        if old is None:
+            changes.append({"kind": "added", "gamePk": pk, "matchup": matchup})
+            continue
+        for side in ("away", "home"):
+            if old.get(f"probable_{side}_id") != g.get(f"probable_{side}_id"):
+                changes.append({
+                    "kind": "pitchers", "gamePk": pk, "matchup": matchup, "side": side,
+                    "before": old.get(f"{side}_pitcher") or "TBD", "after": g.get(f"{side}_pitcher") or "TBD",
+                })
+        if g.get("source") and old.get("source") != g.get("source"):
+            changes.append({"kind": "article", "gamePk": pk, "matchup": matchup, "after": g.get("source")})
+    for pk, old in prev.items():
+        if pk not in seen:
+            changes.append({"kind": "removed", "gamePk": pk,
+                            "matchup": f"{old.get('away_name')} @ {old.get('home_name')}"})
+    return changes
+
+
+def log_changes(changes: list[dict]):
+    if not changes:
+        log.info("Incremental: no changes since the last run")
+        return
+    for c in changes:
+        if c["kind"] == "pitchers":
+            log.info(f"Incremental: {c['matchup']} {c['side']} probable {c['before']} → {c['after']}")
+        else:
+            log.info(f"Incremental: {c['matchup']} {c['kind']}")
@@ -0,0 +1,133 @@
+# app/json_stream.py
+# Incremental reader for StatsAPI schedule responses. Walks the top-level
+# structure of {"dates": [{"date": …, "games": [ … ]}, …]} as text chunks
+# arrive and hands out one game at a time, so a season-long range never
+# has to sit in memory as one decoded tree. Each game object itself is
+# decoded with json's C raw_decode once its bytes are buffered.
+
+import json
+from typing import Iterable, Iterator
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\r\n"
+_COMPACT_AT = 1 << 16   # drop consumed buffer text once this much has piled up
+
+
+class _Reader:
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                if self.pos >= _COMPACT_AT:
+                    self.buf, self.pos = self.buf[self.pos:], 0
+                self.buf += chunk
+                return True
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character (not consumed), '' at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"expected {ch!r} at offset {self.pos}, got {got!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more input until it is complete."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number (or literal) flush with the buffer end may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def members(self) -> Iterator[str]:
+        """Iterate the keys of an object; the caller must consume each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            nxt = self.peek()
+            self.pos += 1
+            if nxt == "}":
+                return
+            if nxt != ",":
+                raise ValueError(f"expected ',' or '}}' at offset {self.pos - 1}, got {nxt!r}")
+
+    def elements(self) -> Iterator[None]:
+        """Iterate the slots of an array; the caller must consume each element."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            nxt = self.peek()
+            self.pos += 1
+            if nxt == "]":
+                return
+            if nxt != ",":
+                raise ValueError(f"expected ',' or ']' at offset {self.pos - 1}, got {nxt!r}")
+
+
+def iter_schedule_games(chunks: Iterable[str]) -> Iterator[tuple[str, dict]]:
+    """
+    (slate date, raw game dict) for every game of a schedule response given
+    as text chunks, in document order. Other keys are decoded and dropped.
+    """
+    r = _Reader(chunks)
+    for key in r.members():
+        if key != "dates":
+            r.value()
+            continue
+        for _ in r.elements():
+            day, pending = None, []
+            for dkey in r.members():
+                if dkey == "date":
+                    day = r.value()
+                    yield from ((day, g) for g in pending)
+                    pending = []
+                elif dkey == "games":
+                    for _ in r.elements():
+                        g = r.value()
+                        if day is None:
+                            pending.append(g)  # "games" before "date": hold until we know the day
+                        else:
+                            yield day, g
+                else:
+                    r.value()
+            for g in pending:
+                yield day, g
+
+
+def text_chunks(text: str, size: int = 64 * 1024) -> Iterator[str]:
+    """Feed an in-memory body (cache hit, replay) through the same reader."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
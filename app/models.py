@@ -0,0 +1,128 @@
+# app/models.py
+# Compact game records. filter_and_annotate_games projects each hydrated
+# StatsAPI game (a deep dict of several KB) onto a slotted Game that holds
+# only what matching, pitcher stats and the templates read; teams are
+# shared, interned Team records. Game keeps a small dict-style adapter
+# (get / [] / []= / in) so templates and older call sites keep working.
+
+from dataclasses import dataclass, fields
+
+
+@dataclass(frozen=True, slots=True)
+class Team:
+    id: int
+    name: str
+    record: str | None = None
+    is_contender: bool = False
+    div_id: int | None = None
+    league_id: int | None = None
+
+
+_TEAMS: dict[tuple, Team] = {}
+
+
+def clear_teams():
+    """
+    Forget interned teams; called at the start of each run so a long-lived
+    process (--daemon) does not keep every record it has ever seen. Games
+    already built keep their Team objects.
+    """
+    _TEAMS.clear()
+
+
+def intern_team(team_id: int, name: str, meta: dict) -> Team:
+    """One shared Team per distinct (id, name, record, flags): a season backfill reuses them across days."""
+    record = meta.get("record")
+    if not record and meta.get("w") is not None and meta.get("l") is not None:
+        record = f"{meta['w']}-{meta['l']}"
+    key = (team_id, name, record, bool(meta.get("is_contender")), meta.get("div_id"), meta.get("league_id"))
+    team = _TEAMS.get(key)
+    if team is None:
+        team = _TEAMS.setdefault(key, Team(*key))
+    return team
+
+
+@dataclass(slots=True)
+class Game:
+    game_pk: int
+    game_iso: str | None
+    myt_time_str: str
+    home: Team
+    away: Team
+    is_contender: bool = False
+    both_contenders: bool = False
+    same_division: bool = False
+    same_league: bool = False
+    probable_home_id: int | None = None
+    probable_away_id: int | None = None
+    home_pitcher: str = "TBD"
+    away_pitcher: str = "TBD"
+    home_era: str = "—"
+    away_era: str = "—"
+    home_whip: str = "—"
+    away_whip: str = "—"
+    home_form: dict | None = None
+    away_form: dict | None = None
+    narrative: str | None = None
+    source: str | None = None
+
+    # --- flat names the template and older code use ---
+    @property
+    def gamePk(self) -> int:
+        return self.game_pk
+
+    @property
+    def gameDate(self) -> str | None:
+        return self.game_iso
+
+    @property
+    def home_name(self) -> str:
+        return self.home.name
+
+    @property
+    def away_name(self) -> str:
+        return self.away.name
+
+    @property
+    def home_record(self) -> str | None:
+        return self.home.record
+
+    @property
+    def away_record(self) -> str | None:
+        return self.away.record
+
+    @property
+    def home_is_contender(self) -> bool:
+        return self.home.is_contender
+
+    @property
+    def away_is_contender(self) -> bool:
+        return self.away.is_contender
+
+    # --- dict-style adapter ---
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in KEYS else default
+
+    def __getitem__(self, key: str):
+        if key not in KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in KEYS
+
+    def to_dict(self) -> dict:
+        """Flat dict of every key (teams as their names)."""
+        return {k: getattr(self, k) for k in KEYS if k not in ("home", "away")}
+
+
+_FIELDS = frozenset(f.name for f in fields(Game))
+KEYS = _FIELDS | {
+    "gamePk", "gameDate", "home_name", "away_name", "home_record", "away_record",
+    "home_is_contender", "away_is_contender",
+}
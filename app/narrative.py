@@ -1,73 +1,187 @@
 # app/narrative.py
+import json
 import os
-import time
 import random
-from openai import OpenAI
-import openai
-import re
-from app.teams import TEAMS, ALIAS_TO_FULL, FULL_TO_ALIASES
+from concurrent.futures import ThreadPoolExecutor
+from app import replay, summary_cache, trace
+from app.excerpt import key_sentences, select_excerpt
+from app.models import Game
+from app.ratelimit import TokenBucket
+from app.team_index import count_mentions, mentioned_teams, resolve_team, team_pairs
 
-# --- Global OpenAI throttle ---
-_LAST_OPENAI_CALL_TS = 0.0
-_MIN_INTERVAL = float(os.getenv("OPENAI_MIN_INTERVAL_SEC", "8"))  # seconds
+# --- OpenAI rate limits (match your account tier) ---
+_RPM = float(os.getenv("OPENAI_RPM", "60"))           # requests per minute
+_TPM = float(os.getenv("OPENAI_TPM", "150000"))       # tokens per minute
+_CONCURRENCY = max(1, int(os.getenv("OPENAI_CONCURRENCY", "4")))
+# Buckets hold ~10s worth of budget so a slate can start in a burst
+_REQUEST_BUCKET = TokenBucket(_RPM / 60.0, capacity=max(1.0, _RPM / 6.0))
+_TOKEN_BUCKET = TokenBucket(_TPM / 60.0, capacity=max(1.0, _TPM / 6.0))
+
+# Batch mode: pack up to OPENAI_BATCH_SIZE matchups into one request answered as JSON
+_BATCH = os.getenv("OPENAI_BATCH", "0") == "1"
+_BATCH_SIZE = max(1, int(os.getenv("OPENAI_BATCH_SIZE", "6")))
+
+# Bump whenever the prompt wording changes so cached summaries are not reused
+PROMPT_VERSION = "2"
+BATCH_PROMPT_VERSION = PROMPT_VERSION + "-batch"
+MODEL = "gpt-4o-mini"
 
 def _summarize_text(
     text: str,
     title: str | None = None,
     matchup_hint: tuple[str | None, str | None] = (None, None),
     contender: bool = False,
+    teams=(),
+    pitchers=(),
 ) -> str:
     """
-    Summarize to 1–2 sentences with OpenAI if key present, else fallback to first 2 sentences.
+    Summarize to 1–2 sentences with OpenAI if key present, else fallback to
+    the article's most relevant sentences. Only the paragraphs about this
+    matchup (hint + `teams`, probable `pitchers`, stat talk) are sent, within
+    OPENAI_EXCERPT_TOKENS (see app.excerpt).
     Uses gpt-4o for contender games, gpt-4o-mini otherwise.
+    OpenAI summaries are cached by a hash of model, prompt version and inputs
+    (bypassed while recording/replaying so the archive sees every call).
     """
+    teams = {*teams, *matchup_hint} - {None}
     api = os.getenv("OPENAI_API_KEY")
-    if api:
+    if api or replay.replaying():
         try:
-            openai.api_key = api
-            t1, t2 = matchup_hint
-            hint = f"This article is about {t1} vs {t2}. Keep the preview focused on that matchup.\n\n" if t1 and t2 else ""
+            excerpt = select_excerpt(text, teams, pitchers)
             prompt = (
-                hint +
+                _hint_text(matchup_hint) +
                 "Write a crisp 1–2 sentence MLB matchup preview from the text below. "
                 "Focus on the starting pitchers' recent form and any team trend stakes.\n\n"
                 f"Title: {title or ''}\n\n"
-                f"Text:\n{text[:1500]}"
+                f"Text:\n{excerpt}"
             )
 
             # ✅ Distinguish models by contender flag
-            model_choice = "gpt-4o-mini"
+            model_choice = MODEL
+
+            use_cache = replay.mode() is None
+            cache_key = summary_cache.make_key(model_choice, PROMPT_VERSION, title, matchup_hint, excerpt)
+            cached = summary_cache.get(cache_key) if use_cache else None
+            if cached:
+                return cached
 
-            resp = _safe_chat_completion(
+            summary = _chat_text(
                 model=model_choice,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=120,
                 temperature=0.2,
                 timeout=60,
-            )
-            return resp.choices[0].message.content.strip()
+            ).strip()
+            if use_cache:
+                summary_cache.put(cache_key, summary)
+            return summary
         except Exception as e:
             print(f"[WARN] Falling back due to {e}")
 
-    # Fallback: take first ~2 sentences
-    parts = [p.strip() for p in text.replace("\n", " ").split(". ") if p.strip()]
-    return (". ".join(parts[:2]) + ".") if parts else ""
-
-
-def _match_title_to_game(title: str, away: str, home: str) -> bool:
-    """Check if article title matches the away vs home matchup."""
-    t = title.lower()
-    away_key = away.split()[-1].lower()
-    home_key = home.split()[-1].lower()
-    return (
-        (away.lower() in t and home.lower() in t)
-        or (away_key in t and home_key in t)
-        or (f"{away_key} vs {home_key}" in t)
-        or (f"{home_key} vs {away_key}" in t)
+    # Fallback: the two most relevant sentences
+    return key_sentences(text, teams, pitchers)
+
+
+def _focus(g: Game, picked: dict) -> tuple[set, tuple]:
+    """(teams, probable starters) an excerpt for this game should be about."""
+    teams = {picked.get("t1"), picked.get("t2"), resolve_team(g.away_name or ""), resolve_team(g.home_name or "")}
+    return teams - {None}, (g.away_pitcher, g.home_pitcher)
+
+
+def _hint_text(matchup_hint: tuple[str | None, str | None]) -> str:
+    t1, t2 = matchup_hint
+    return f"This article is about {t1} vs {t2}. Keep the preview focused on that matchup.\n\n" if t1 and t2 else ""
+
+
+def _summarize_batch(picks: list[tuple]) -> list[str]:
+    """
+    Batch mode: summaries for (game, picked article) pairs, OPENAI_BATCH_SIZE
+    matchups per request, answered as one JSON object keyed by gamePk.
+    Cached summaries are served first; games whose key is missing or
+    malformed in a reply (or whose whole request failed) fall back to a
+    single-game _summarize_text call.
+    """
+    use_cache = replay.mode() is None
+    out: list[str | None] = [None] * len(picks)
+    pending = []
+    for i, (g, picked) in enumerate(picks):
+        excerpt = select_excerpt(picked.get("body", ""), *_focus(g, picked))
+        hint = (picked.get("t1"), picked.get("t2"))
+        # The game facts are part of a batch prompt, so they are part of the key
+        key = summary_cache.make_key(
+            MODEL, BATCH_PROMPT_VERSION, picked.get("title"), hint, _fallback_narrative(g) + "\n\n" + excerpt
+        )
+        cached = summary_cache.get(key) if use_cache else None
+        if cached:
+            out[i] = cached
+        else:
+            pending.append((i, key, excerpt))
+
+    def _run(chunk):
+        try:
+            replies = _chat_batch([(picks[i][0], picks[i][1], excerpt) for i, _, excerpt in chunk])
+        except Exception as e:
+            print(f"[WARN] Batch of {len(chunk)} summaries failed ({e}); summarizing one by one")
+            replies = {}
+        for i, key, _ in chunk:
+            summary = replies.get(str(picks[i][0].game_pk))
+            if summary:
+                if use_cache:
+                    summary_cache.put(key, summary)
+            else:
+                g, picked = picks[i]
+                teams, pitchers = _focus(g, picked)
+                trace.add("openai.batch_fallbacks")
+                summary = _summarize_text(
+                    picked.get("body", ""), picked.get("title"), (picked.get("t1"), picked.get("t2")),
+                    teams=teams, pitchers=pitchers,
+                )
+            out[i] = summary
+
+    chunks = [pending[k:k + _BATCH_SIZE] for k in range(0, len(pending), _BATCH_SIZE)]
+    if len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(_CONCURRENCY, len(chunks))) as pool:
+            list(pool.map(_run, chunks))
+    else:
+        for chunk in chunks:
+            _run(chunk)
+    return out
+
+
+def _chat_batch(items: list[tuple]) -> dict[str, str]:
+    """One JSON-mode request for several (game, article, excerpt) triples → {str(gamePk): preview}."""
+    blocks = []
+    for g, picked, excerpt in items:
+        blocks.append(
+            f"### Game {g.game_pk}: {g.away_name} at {g.home_name}\n"
+            f"Facts: {_fallback_narrative(g)}\n"
+            + _hint_text((picked.get("t1"), picked.get("t2"))) +
+            f"Title: {picked.get('title') or ''}\n\n"
+            f"Text:\n{excerpt}"
+        )
+    prompt = (
+        "For each MLB game below, write a crisp 1–2 sentence matchup preview from its article text. "
+        "Focus on the starting pitchers' recent form and any team trend stakes.\n"
+        "Reply with a JSON object mapping each game id (the number after \"Game\") to its preview, "
+        'e.g. {"745123": "…"}, with every game included.\n\n'
+        + "\n\n".join(blocks)
+    )
+    content = _chat_text(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=120 * len(items) + 40,
+        temperature=0.2,
+        timeout=90,
+        response_format={"type": "json_object"},
     )
+    trace.add("openai.batch_requests")
+    data = json.loads(content or "{}")
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    return {str(k): v.strip() for k, v in data.items() if isinstance(v, str) and v.strip()}
 
 
-def _fallback_narrative(g: dict) -> str:
+def _fallback_narrative(g: Game) -> str:
     """Build a deterministic 1–2 sentence preview from available fields."""
     away = g.get("away_name") or g.get("away") or "Away"
     home = g.get("home_name") or g.get("home") or "Home"
@@ -83,88 +197,179 @@ def _fallback_narrative(g: dict) -> str:
     tag = "division clash" if g.get("same_division") else ("league matchup" if g.get("same_league") else "interleague")
     s1 = f"{away} ({ar}) visit {home} ({hr}) in a {tag}; first pitch {when}."
     s2 = f"Probables: {ap} (ERA {aera}, WHIP {awhip}) vs {hp} (ERA {hera}, WHIP {hwhip})."
+    af, hf = g.get("away_form"), g.get("home_form")
+    if af or hf:
+        parts = [f"{name} {f['ERA']} ERA, {f['K9']} K/9" for name, f in ((ap, af), (hp, hf)) if f]
+        return f"{s1} {s2} Last 3 starts: {'; '.join(parts)}."
     return f"{s1} {s2}"
 
 
-def match_and_summarize(games: list[dict], flm_articles: list[dict]) -> int:
-    """Attach narratives from FLM/OpenAI or fallback for each game."""
-    indexed = []
-    for art in flm_articles:
+def match_and_summarize(games: list[Game], flm_articles: list[dict], previous: dict | None = None) -> int:
+    """
+    Attach narratives from FLM/OpenAI or fallback for each game.
+    Articles are picked serially (cheap); summaries for the picked games run
+    concurrently on OPENAI_CONCURRENCY threads under the shared rate limits.
+
+    `previous` (see app.incremental.previous_narratives) lets a re-run keep
+    a game's narrative when it picked the same article for the same
+    contender flag and the same probable starters.
+    """
+    previous = previous or {}
+    # Index articles once by unordered team pair so each game is a dict lookup:
+    #   1) pair of teams named in the title (full names or nicknames)
+    #   2) pair of most-mentioned teams in title + first two paragraphs
+    #   3) a single team named in full in the title (earliest article wins)
+    by_title_pair: dict[frozenset, dict] = {}
+    by_top_pair: dict[frozenset, dict] = {}
+    by_title_team: dict[str, tuple[int, dict]] = {}
+    for i, art in enumerate(flm_articles):
         title = art.get("title") or ""
         body = art.get("body") or ""
         first2 = _first_two_paras(body)
         t1, t2 = _top_two_teams(title, first2)
-        indexed.append({"title": title, "url": art.get("url"), "body": body, "t1": t1, "t2": t2})
+        entry = {"title": title, "url": art.get("url"), "body": body, "t1": t1, "t2": t2}
+        for pair in team_pairs(mentioned_teams(title, abbreviations=False)):
+            by_title_pair.setdefault(pair, entry)
+        if t1 and t2:
+            by_top_pair.setdefault(frozenset((t1, t2)), entry)
+        for full in mentioned_teams(title, full_names_only=True):
+            by_title_team.setdefault(full, (i, entry))
 
-    matched = 0
+    picks = []
+    reused = 0
     for g in games:
-        away = g.get("away_name", "") or g.get("away", "") or ""
-        home = g.get("home_name", "") or g.get("home", "") or ""
-        picked = None
-
-        for art in indexed:
-            if _match_title_to_game(art["title"], away, home):
-                picked = art
-                break
-        if not picked:
-            g_home_full = _guess_full_from_name(home)
-            g_away_full = _guess_full_from_name(away)
-            for art in indexed:
-                a, b = art["t1"], art["t2"]
-                if a and b and g_home_full and g_away_full and {a, b} == {g_home_full, g_away_full}:
-                    picked = art
-                    break
+        away_full = resolve_team(g.away_name or "")
+        home_full = resolve_team(g.home_name or "")
+        pair = frozenset((away_full, home_full)) if away_full and home_full else None
+
+        picked = by_title_pair.get(pair) or by_top_pair.get(pair)
         if not picked:
-            for art in indexed:
-                t = art["title"].lower()
-                if away.lower() in t or home.lower() in t:
-                    picked = art
-                    break
-
-        if picked:
-            hint = (picked.get("t1"), picked.get("t2"))
-            narrative = _summarize_text(
-                picked.get("body", ""),
-                picked.get("title"),
-                hint,
-                contender=g.get("is_contender", False),  # ✅ pass flag here
-            )
-            g["narrative"] = narrative or _fallback_narrative(g)
-            g["source"] = picked.get("url")
-            matched += 1
+            hits = [by_title_team[f] for f in (away_full, home_full) if f in by_title_team]
+            if hits:
+                picked = min(hits, key=lambda h: h[0])[1]
+
+        old = previous.get(str(g.game_pk))
+        if (
+            picked and old
+            and old["source"] == picked.get("url")
+            and old["is_contender"] == g.is_contender
+            and old.get("probable_home_id") == g.probable_home_id
+            and old.get("probable_away_id") == g.probable_away_id
+        ):
+            g.narrative, g.source = old["narrative"], old["source"]
+            reused += 1
+        elif picked:
+            picks.append((g, picked))
         else:
-            g["narrative"] = _fallback_narrative(g)
-            g["source"] = None
+            g.narrative = _fallback_narrative(g)
+            g.source = None
+
+    def _summarize(pick):
+        g, picked = pick
+        hint = (picked.get("t1"), picked.get("t2"))
+        teams, pitchers = _focus(g, picked)
+        return _summarize_text(
+            picked.get("body", ""),
+            picked.get("title"),
+            hint,
+            contender=g.is_contender,  # ✅ pass flag here
+            teams=teams,
+            pitchers=pitchers,
+        )
 
-    return matched
+    if _BATCH and (os.getenv("OPENAI_API_KEY") or replay.replaying()) and len(picks) > 1:
+        narratives = _summarize_batch(picks)
+    elif os.getenv("OPENAI_API_KEY") and len(picks) > 1:
+        with ThreadPoolExecutor(max_workers=_CONCURRENCY) as pool:
+            narratives = list(pool.map(_summarize, picks))
+    else:
+        narratives = [_summarize(p) for p in picks]
 
+    for (g, picked), narrative in zip(picks, narratives):
+        g.narrative = narrative or _fallback_narrative(g)
+        g.source = picked.get("url")
 
-def _throttle_openai():
-    """Enforce a minimum interval between OpenAI calls."""
-    global _LAST_OPENAI_CALL_TS
-    now = time.time()
-    wait = _MIN_INTERVAL - (now - _LAST_OPENAI_CALL_TS)
-    if wait > 0:
-        time.sleep(wait)
-    _LAST_OPENAI_CALL_TS = time.time()
+    if reused:
+        print(f"[INFO] Reused {reused} narrative(s) from the last run")
+        trace.add("narratives_reused", reused)
+    summary_cache.log_stats()
+    return len(picks) + reused
+
+
+def _chat_text(**kwargs) -> str:
+    """Chat completion content, served from / saved to the replay archive when active."""
+    if replay.replaying():
+        return replay.chat_response(replay.chat_key(kwargs))
+    content = _safe_chat_completion(**kwargs).choices[0].message.content or ""
+    if replay.recording():
+        replay.record_chat(replay.chat_key(kwargs), content)
+    return content
+
+
+def _estimate_tokens(kwargs: dict) -> int:
+    """Rough prompt + completion token count (~4 chars per token)."""
+    chars = sum(len(m.get("content") or "") for m in kwargs.get("messages", []))
+    return chars // 4 + int(kwargs.get("max_tokens") or 0)
+
+
+def _retry_after(err: Exception) -> float | None:
+    """Seconds the server asked us to wait, from Retry-After(-ms) headers."""
+    headers = getattr(getattr(err, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _throttle_openai(tokens: int):
+    """Wait for room in both the requests/min and tokens/min buckets."""
+    waited = _REQUEST_BUCKET.acquire() + _TOKEN_BUCKET.acquire(tokens)
+    trace.add("openai.throttle_sleep_s", waited)
+
+
+def _openai():
+    """The OpenAI SDK, imported on first real call (it pulls in httpx and
+    pydantic); fallback-only and replayed runs never load it."""
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    return openai
 
 
 def _safe_chat_completion(**kwargs):
+    openai = _openai()
     retries = 5
     backoff = 2.0
     last_err = None
+    tokens = _estimate_tokens(kwargs)
     for attempt in range(1, retries + 1):
         try:
-            _throttle_openai()
-            return openai.chat.completions.create(**kwargs)
+            _throttle_openai(tokens)
+            with trace.span("chat.completions", cat="openai", model=kwargs.get("model")) as attrs:
+                resp = openai.chat.completions.create(**kwargs)
+                usage = getattr(resp, "usage", None)
+                if usage is not None:
+                    attrs.update(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+                    trace.add("openai.prompt_tokens", usage.prompt_tokens)
+                    trace.add("openai.completion_tokens", usage.completion_tokens)
+            trace.add("openai.requests")
+            return resp
         except Exception as e:
             msg = str(e)
             last_err = e
-            if "429" in msg or "rate limit" in msg.lower():
-                sleep_s = backoff + random.uniform(0, 1)
+            if isinstance(e, openai.RateLimitError) or "429" in msg or "rate limit" in msg.lower():
+                sleep_s = _retry_after(e)
+                if sleep_s is None:
+                    sleep_s = backoff + random.uniform(0, 1)
+                    backoff *= 2
                 print(f"[429] Rate limited, sleeping {sleep_s:.1f}s (attempt {attempt}/{retries})")
-                time.sleep(sleep_s)
-                backoff *= 2
+                trace.add("openai.rate_limited")
+                # Hold back every worker, not just this one
+                _REQUEST_BUCKET.drain(sleep_s)
                 continue
             raise
     raise RuntimeError(f"OpenAI call failed after retries: {last_err}")
@@ -172,26 +377,12 @@ def _safe_chat_completion(**kwargs):
 
 
 # --- Utilities ---
-_WORD_RE_CACHE: dict[str, re.Pattern] = {}
-
 def _first_two_paras(body: str) -> str:
     parts = [p.strip() for p in (body or "").split("\n\n") if p.strip()]
     return "\n\n".join(parts[:2])
 
 def _count_mentions(text: str) -> dict[str, int]:
-    text = (text or "").lower()
-    counts = {t["full"]: 0 for t in TEAMS}
-    for full, aliases in FULL_TO_ALIASES.items():
-        for alias in aliases:
-            pat = _WORD_RE_CACHE.get(alias)
-            if not pat:
-                escaped = re.escape(alias).replace(r"\ ", r"\s+")
-                pat = re.compile(rf"(?<!\w){escaped}(?!\w)", re.IGNORECASE)
-                _WORD_RE_CACHE[alias] = pat
-            hits = pat.findall(text)
-            if hits:
-                counts[full] += len(hits)
-    return counts
+    return count_mentions(text)
 
 def _top_two_teams(title: str, body_first_two_paras: str) -> tuple[str | None, str | None]:
     combined = " ".join([title or "", body_first_two_paras or ""])
@@ -203,17 +394,3 @@ def _top_two_teams(title: str, body_first_two_paras: str) -> tuple[str | None, s
     if len(ranked) == 1:
         return ranked[0][0], None
     return None, None
-
-def _guess_full_from_name(name: str) -> str | None:
-    if not name:
-        return None
-    n = name.lower()
-    for t in TEAMS:
-        if t["full"].lower() == n:
-            return t["full"]
-    for alias, full in ALIAS_TO_FULL.items():
-        if alias in n:
-            if alias == "st. louis" and "cardinals" not in n:
-                continue
-            return full
-    return None
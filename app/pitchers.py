@@ -1,24 +1,125 @@
-import requests
+import os
+from datetime import date, timedelta
+
+from app import replay, store
+from app.http_cache import get_json
 
 MLB_API = "https://statsapi.mlb.com/api/v1"
+CACHE_TTL = float(os.getenv("PITCHER_CACHE_TTL", "3600"))  # seconds
+BATCH_SIZE = int(os.getenv("PITCHER_BATCH_SIZE", "100"))   # personIds per request
+FORM_WINDOWS = (3, 5)                                      # rolling "last N starts"
+
+def fetch_pitcher_stats(ids: set[int] | list[int], season: int | None = None):
+    """
+    Returns { personId: {"ERA": str|None, "WHIP": str|None, "L3": {...}, "L5": {...}} }:
+    season totals plus rolling form over the last 3/5 starts of `season`
+    (default: the current one, which is what StatsAPI answers for), so the
+    form resets each year (see recent_form).
+    IDs are sent in batches of PITCHER_BATCH_SIZE per `people` request, each
+    hydrating both the season line and the game log.
+    Results are saved to the local store as today's snapshot; in
+    read-from-store mode only IDs missing from it are requested. Game logs
+    are kept in the store, so pitchers seen before only ask for starts since
+    their newest stored one (not while recording/replaying, see _stored_logs).
+    """
+    wanted = {int(i) for i in set(ids) if i}
+    out = {}
+    if store.reading():
+        out = store.load_pitcher_stats(wanted, store.today())
+    missing = sorted(wanted - set(out))
+    if season is None:
+        season = store.today().year
+
+    use_stored = _stored_logs()
+    logs = store.load_game_logs(wanted, season) if use_stored else {}
+    if missing:
+        fetched, new_logs = _fetch_people(missing, store.last_log_dates(missing, season) if use_stored else {})
+        store.save_pitcher_stats(fetched, store.today())
+        store.save_game_logs(new_logs)
+        out.update(fetched)
+        for pid, rows in new_logs.items():
+            logs[pid] = _merge_logs(logs.get(pid, []), rows)
+
+    for pid in out:
+        out[pid].update(recent_form(logs.get(pid, [])))
+    return out
+
+
+def _stored_logs() -> bool:
+    # Recorded/replayed runs ignore stored logs, so the `people` requests
+    # (startDate) never depend on what happens to be in the local store
+    return replay.mode() is None
+
 
-def fetch_pitcher_stats(ids: set[int] | list[int]):
+def fetch_game_logs(ids, season: int) -> dict:
     """
-    Returns { personId: {"ERA": str|None, "WHIP": str|None} } for season totals
+    {personId: game log of `season`, oldest first} for every id (empty
+    list when the pitcher has none), for point-in-time stats (see
+    stats_as_of). Stored logs of that season are extended the same way as
+    in fetch_pitcher_stats.
     """
-    ids = [str(i) for i in ids if i]
-    if not ids:
-        return {}
+    wanted = sorted({int(i) for i in set(ids) if i})
+    use_stored = _stored_logs()
+    logs = store.load_game_logs(wanted, season) if use_stored else {}
+    _, new_logs = _fetch_people(wanted, store.last_log_dates(wanted, season) if use_stored else {}, season)
+    store.save_game_logs(new_logs)
+    return {pid: _merge_logs(logs.get(pid, []), new_logs.get(pid, [])) for pid in wanted}
+
+
+def stats_as_of(logs: list[dict], as_of: date) -> dict:
+    """
+    {"ERA", "WHIP", "L3", "L5"} as they stood the night before `as_of`:
+    season totals and recent form rebuilt from appearances dated before it.
+    """
+    cutoff = (as_of - timedelta(days=1)).isoformat()
+    before = [r for r in logs if r["game_date"] <= cutoff]
+    outs = sum(r["outs"] for r in before)
+    out = {"ERA": None, "WHIP": None}
+    if outs:
+        out["ERA"] = f"{27 * sum(r['er'] for r in before) / outs:.2f}"
+        out["WHIP"] = f"{3 * sum(r['h'] + r['bb'] for r in before) / outs:.2f}"
+    out.update(recent_form(before))
+    return out
+
+
+def _fetch_people(ids: list[int], last_dates: dict, season: int | None = None) -> tuple[dict, dict]:
+    """
+    Batched `people` calls. IDs without stored logs get the whole season's
+    game log; the rest share one startDate (the oldest of their newest
+    stored starts), which keeps it to at most two groups of batches.
+    Without `season`, StatsAPI answers for the current one.
+    """
+    fresh = [i for i in ids if i not in last_dates]
+    known = [i for i in ids if i in last_dates]
+    groups = [(fresh, None)]
+    if known:
+        groups.append((known, min(last_dates[i] for i in known)))
 
     url = f"{MLB_API}/people"
-    params = {
-        "personIds": ",".join(ids),
-        "hydrate": "stats(group=[pitching],type=[season])"
-    }
-    r = requests.get(url, params=params, timeout=25)
-    r.raise_for_status()
-    data = r.json()
+    stats, logs = {}, {}
+    for group, since in groups:
+        for start in range(0, len(group), BATCH_SIZE):
+            params = {
+                "personIds": ",".join(str(i) for i in group[start:start + BATCH_SIZE]),
+                "hydrate": _hydrate(since, season),
+            }
+            data = get_json(url, params=params, ttl=CACHE_TTL)
+            stats.update(parse_pitcher_stats(data))
+            logs.update(parse_game_logs(data))
+    return stats, logs
+
 
+def _hydrate(since: date | None, season: int | None = None) -> str:
+    opts = "group=[pitching],type=[season,gameLog]"
+    if season is not None:
+        opts += f",season={season}"
+    if since is not None:
+        opts += f",startDate={since.isoformat()}"
+    return f"stats({opts})"
+
+
+def parse_pitcher_stats(data: dict) -> dict:
+    """Pull season ERA/WHIP per pitcher out of a hydrated `people` payload."""
     out = {}
     for p in data.get("people", []):
         pid = p.get("id")
@@ -32,3 +133,86 @@ def fetch_pitcher_stats(ids: set[int] | list[int]):
                     whip = stat.get("whip")
         out[pid] = {"ERA": era, "WHIP": whip}
     return out
+
+
+def parse_game_logs(data: dict) -> dict:
+    """{pitcher_id: [per-game lines, oldest first]} from the gameLog splits of a `people` payload."""
+    out = {}
+    for p in data.get("people", []):
+        rows = []
+        for st in p.get("stats", []):
+            if st.get("type", {}).get("displayName") != "gameLog":
+                continue
+            for split in st.get("splits", []):
+                stat = split.get("stat", {})
+                game_pk = (split.get("game") or {}).get("gamePk")
+                if not game_pk or not split.get("date"):
+                    continue
+                rows.append({
+                    "game_pk": game_pk,
+                    "game_date": split["date"],
+                    "started": int(stat.get("gamesStarted") or 0),
+                    "outs": _outs(stat.get("inningsPitched")),
+                    "er": int(stat.get("earnedRuns") or 0),
+                    "h": int(stat.get("hits") or 0),
+                    "bb": int(stat.get("baseOnBalls") or 0),
+                    "so": int(stat.get("strikeOuts") or 0),
+                })
+        if rows:
+            out[p.get("id")] = sorted(rows, key=lambda r: (r["game_date"], r["game_pk"]))
+    return out
+
+
+def _outs(ip) -> int:
+    """'5.2' innings pitched → 17 outs."""
+    try:
+        whole, _, frac = str(ip or "0").partition(".")
+        return int(whole) * 3 + int(frac or 0)
+    except ValueError:
+        return 0
+
+
+def _merge_logs(old: list[dict], new: list[dict]) -> list[dict]:
+    by_pk = {r["game_pk"]: r for r in old}
+    by_pk.update({r["game_pk"]: r for r in new})
+    return sorted(by_pk.values(), key=lambda r: (r["game_date"], r["game_pk"]))
+
+
+def recent_form(logs: list[dict], windows=FORM_WINDOWS) -> dict:
+    """
+    {"L3": {"ERA", "WHIP", "K9", "starts"}, "L5": {...}} over the last N
+    starts (relief outings are skipped). Windows without a single out
+    recorded are left out. Plain sums: there is no numpy dependency, and a
+    window is at most five rows.
+    """
+    starts = [r for r in logs if r["started"]]
+    out = {}
+    for n in windows:
+        last = starts[-n:]
+        outs = sum(r["outs"] for r in last)
+        if not outs:
+            continue
+        out[f"L{n}"] = {
+            "ERA": f"{27 * sum(r['er'] for r in last) / outs:.2f}",
+            "WHIP": f"{3 * sum(r['h'] + r['bb'] for r in last) / outs:.2f}",
+            "K9": f"{27 * sum(r['so'] for r in last) / outs:.1f}",
+            "starts": len(last),
+        }
+    return out
+
+
+def apply_pitcher_stats(games, stat_map):
+    """Write stats into the Game fields the template reads."""
+    for g in games:
+        ph, pa = g.probable_home_id, g.probable_away_id
+        if ph:
+            stats = stat_map.get(ph) or {}
+            g.home_era  = stats.get("ERA")  or g.home_era  or "—"
+            g.home_whip = stats.get("WHIP") or g.home_whip or "—"
+            g.home_form = stats.get("L3")
+        if pa:
+            stats = stat_map.get(pa) or {}
+            g.away_era  = stats.get("ERA")  or g.away_era  or "—"
+            g.away_whip = stats.get("WHIP") or g.away_whip or "—"
+            g.away_form = stats.get("L3")
+    return games
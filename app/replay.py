@@ -0,0 +1,118 @@
+# app/replay.py
+# Record/replay of every external response for offline, deterministic runs.
+#
+# Record mode snapshots HTTP bodies (StatsAPI, Reuters), chat completions and
+# the run's wall clock into a gzipped JSON archive; replay mode serves them
+# back through the same fetch functions without touching the network.
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+
+log = logging.getLogger("mlb.replay")
+
+ARCHIVE_VERSION = 1
+
+_mode: str | None = None        # None | "record" | "replay"
+_path: str | None = None
+_archive: dict = {}
+_lock = threading.Lock()
+
+
+class ReplayMiss(KeyError):
+    """Replay was asked for a response the archive does not contain."""
+
+
+def _empty() -> dict:
+    return {"version": ARCHIVE_VERSION, "now": None, "http": {}, "chat": {}}
+
+
+def configure(record: str | None = None, replay: str | None = None):
+    """Switch to record or replay mode (at most one); no-op when both are empty."""
+    global _mode, _path, _archive
+    if record and replay:
+        raise ValueError("Choose either record or replay, not both")
+    if replay:
+        with gzip.open(replay, "rt", encoding="utf-8") as f:
+            _archive = json.load(f)
+        if _archive.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported replay archive version: {_archive.get('version')}")
+        _mode, _path = "replay", replay
+        log.info(f"Replaying from {replay} ({len(_archive['http'])} HTTP, {len(_archive['chat'])} chat)")
+    elif record:
+        _archive = _empty()
+        _mode, _path = "record", record
+        atexit.register(save)
+        log.info(f"Recording external responses to {record}")
+
+
+def mode() -> str | None:
+    return _mode
+
+
+def recording() -> bool:
+    return _mode == "record"
+
+
+def replaying() -> bool:
+    return _mode == "replay"
+
+
+def save():
+    """Write the recorded archive (called automatically at exit in record mode)."""
+    if _mode != "record":
+        return
+    with _lock:
+        with gzip.open(_path, "wt", encoding="utf-8", compresslevel=9) as f:
+            json.dump(_archive, f, ensure_ascii=False, separators=(",", ":"))
+    log.info(f"Recorded {len(_archive['http'])} HTTP and {len(_archive['chat'])} chat response(s) to {_path}")
+
+
+def now(tz=timezone.utc) -> datetime:
+    """Wall clock, pinned to the recorded run's start when replaying."""
+    with _lock:
+        if _mode == "replay" and _archive.get("now"):
+            return datetime.fromisoformat(_archive["now"]).astimezone(tz)
+        current = datetime.now(timezone.utc)
+        if _mode == "record" and not _archive.get("now"):
+            _archive["now"] = current.isoformat()
+        return current.astimezone(tz)
+
+
+def _get(section: str, key: str):
+    with _lock:
+        try:
+            return _archive[section][key]
+        except KeyError:
+            raise ReplayMiss(f"No recorded {section} response for {key}") from None
+
+
+def _put(section: str, key: str, value):
+    with _lock:
+        _archive[section][key] = value
+
+
+def http_response(key: str) -> str:
+    return _get("http", key)
+
+
+def record_http(key: str, body: str):
+    _put("http", key, body)
+
+
+def chat_key(kwargs: dict) -> str:
+    """Stable key for a chat completion request (model, messages, sampling params)."""
+    payload = json.dumps({k: v for k, v in kwargs.items() if k != "timeout"}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chat_response(key: str) -> str:
+    return _get("chat", key)
+
+
+def record_chat(key: str, content: str):
+    _put("chat", key, content)
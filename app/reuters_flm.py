@@ -1,14 +1,47 @@
+import html as htmllib
+import json
+import logging
 import os
-import random
-import time
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
+from urllib.parse import urlsplit
 
-import requests
-from bs4 import BeautifulSoup
+from app import replay, store, trace
+from app.html_extract import extract_paragraphs, extract_story_cards
+from app.http_cache import get_text
+from app.ratelimit import TokenBucket
+
+log = logging.getLogger("mlb.reuters")
 
 AUTHOR_URL = "https://www.reuters.com/authors/field-level-media/"
 BASE_URL = "https://www.reuters.com"
 
+# Cache TTLs (seconds): the author page is revalidated often, article bodies never change
+AUTHOR_PAGE_TTL = float(os.getenv("FLM_AUTHOR_CACHE_TTL", "900"))
+ARTICLE_TTL = float(os.getenv("FLM_ARTICLE_CACHE_TTL", str(30 * 86400)))
+
+# Crawl: follow the author page's pagination up to FLM_MAX_PAGES deep, and
+# remember processed stories in a cursor so later runs stop where this one began
+MAX_PAGES = max(1, int(os.getenv("FLM_MAX_PAGES", "5")))
+CURSOR_PATH = os.getenv("FLM_CURSOR_PATH", os.path.join(".cache", "flm_cursor.json"))
+CURSOR_ENABLED = os.getenv("FLM_CURSOR", "1") != "0"
+CURSOR_KEEP_HOURS = float(os.getenv("FLM_CURSOR_KEEP_HOURS", "72"))  # seen stories older than this are forgotten
+NEXT_LINK_RE = re.compile(r"<a\b[^>]*\brel=[\"']?next\b[^>]*>", re.I)
+HREF_RE = re.compile(r"\bhref=[\"']([^\"']+)[\"']", re.I)
+
+# Politeness: at most FLM_CONCURRENCY requests in flight per host, and no more
+# than FLM_RATE_PER_SEC requests per second on average (bursts of FLM_BURST)
+CONCURRENCY = max(1, int(os.getenv("FLM_CONCURRENCY", "3")))
+RATE_PER_SEC = float(os.getenv("FLM_RATE_PER_SEC", "1.0"))
+BURST = float(os.getenv("FLM_BURST", "2"))
+
+# "fast" = targeted streaming extractor with BeautifulSoup fallback; "bs4" = BeautifulSoup only
+PARSER = os.getenv("FLM_PARSER", "fast")
+BODY_CLASS_RE = re.compile(r"^article-body__content")
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -19,20 +52,58 @@ HEADERS = {
     "Referer": "https://www.google.com/",
 }
 
-def _sleep(min_s=1.2, max_s=2.8):
-    time.sleep(random.uniform(min_s, max_s))
+_host_limits: dict[str, tuple[threading.BoundedSemaphore, TokenBucket]] = {}
+_host_limits_lock = threading.Lock()
 
-def _fetch_author_page():
-    _sleep()
-    r = requests.get(AUTHOR_URL, headers=HEADERS, timeout=10)
-    r.raise_for_status()
-    return r.text
+def _host_limit(host: str) -> tuple[threading.BoundedSemaphore, TokenBucket]:
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = (threading.BoundedSemaphore(CONCURRENCY), TokenBucket(RATE_PER_SEC, BURST))
+        return _host_limits[host]
+
+def _polite(url: str):
+    """Throttle factory for http_cache: per-host concurrency cap + token bucket."""
+    @contextmanager
+    def _throttle():
+        sem, bucket = _host_limit(urlsplit(url).hostname or "")
+        with sem:
+            trace.add("reuters.throttle_sleep_s", bucket.acquire())
+            yield
+    return _throttle
+
+def _fetch_author_page(url: str = AUTHOR_URL):
+    return get_text(url, headers=HEADERS, ttl=AUTHOR_PAGE_TTL, throttle=_polite(url))
 
 def _is_baseball_url(href: str) -> bool:
     return "/sports/baseball/" in href
 
 def fetch_flm_list(max_items=15):
-    html = _fetch_author_page()
+    return parse_flm_list(_fetch_author_page(), max_items=max_items)
+
+def _absolute(href: str) -> str:
+    return href if href.startswith("http") else BASE_URL + href
+
+def parse_flm_list(html: str, max_items=15):
+    """Baseball story cards (title/url/datetime/desc) from an author page."""
+    return parse_story_cards(html, accept=_is_baseball_url, max_items=max_items)
+
+def parse_story_cards(html: str, accept=None, max_items=None):
+    """Story cards from an author page whose absolute URL passes `accept` (default: every card)."""
+    accept = accept or (lambda url: True)
+    if PARSER == "fast":
+        seen, cards = extract_story_cards(
+            html, accept=lambda c: accept(_absolute(c["href"])), limit=max_items
+        )
+        if seen:
+            return [
+                {"title": c["title"], "url": _absolute(c["href"]), "datetime": c["datetime"], "desc": c["desc"]}
+                for c in cards
+            ]
+    return _parse_story_cards_bs4(html, accept, max_items)
+
+def _parse_story_cards_bs4(html: str, accept, max_items=None):
+    from bs4 import BeautifulSoup  # only on the fallback path
+
     soup = BeautifulSoup(html, "html.parser")
     items = []
     for li in soup.find_all("li", attrs={"data-testid": "StoryCard"}):
@@ -40,10 +111,8 @@ def fetch_flm_list(max_items=15):
         time_tag = li.find("time")
         if not link_tag:
             continue
-        href = link_tag["href"]
-        if not href.startswith("http"):
-            href = BASE_URL + href
-        if not _is_baseball_url(href):
+        href = _absolute(link_tag["href"])
+        if not accept(href):
             continue
 
         title = link_tag.get_text(strip=True)
@@ -51,50 +120,224 @@ def fetch_flm_list(max_items=15):
         desc_tag = li.find("p", {"data-testid": "Description"})
         desc = desc_tag.get_text(strip=True) if desc_tag else ""
         items.append({"title": title, "url": href, "datetime": timestamp, "desc": desc})
-        if len(items) >= max_items:
+        if max_items is not None and len(items) >= max_items:
             break
     return items
 
 def fetch_article_body(url: str) -> str:
-    _sleep(0.8, 1.8)
-    r = requests.get(url, headers=HEADERS, timeout=25)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    content_div = soup.find("div", class_="article-body__content__17Yit")
-    if not content_div:
-        return ""
+    html = get_text(url, headers=HEADERS, ttl=ARTICLE_TTL, throttle=_polite(url))
+    return parse_article_body(html)
+
+def parse_article_body(html: str) -> str:
+    """Article paragraphs joined by blank lines, minus the FLM sign-off."""
+    paras = []
+    if PARSER == "fast":
+        found, paras = extract_paragraphs(html)
+        if not (found and paras):
+            paras = []
+    if not paras:
+        paras = _article_paragraphs_bs4(html)
+    return "\n\n".join(p for p in paras if not p.strip().startswith("--Field Level Media"))
+
+def _article_paragraphs_bs4(html: str) -> list[str]:
+    """
+    BeautifulSoup fallback. Matches the body container by class prefix (the
+    hash suffix changes between Reuters deploys) and, failing that, takes
+    paragraph nodes from anywhere in the page.
+    """
+    from bs4 import BeautifulSoup  # only on the fallback path
+
+    soup = BeautifulSoup(html, "html.parser")
+    content_div = soup.find("div", class_=BODY_CLASS_RE) or soup
     paras = []
     for div in content_div.find_all("div", attrs={"data-testid": True}):
         dtid = div.get("data-testid", "")
         if dtid.startswith("paragraph-"):
-            text = div.get_text(" ", strip=True)
-            if text.strip().startswith("--Field Level Media"):
+            paras.append(div.get_text(" ", strip=True))
+    return paras
+
+def next_page_url(html: str, page: int) -> str:
+    """The page's rel="next" link, else the author page with ?page=N+1."""
+    m = NEXT_LINK_RE.search(html or "")
+    href = m and HREF_RE.search(m.group(0))
+    if href:
+        return _absolute(htmllib.unescape(href.group(1)))
+    return f"{AUTHOR_URL}?page={page + 1}"
+
+def _parse_ts(ts: str | None) -> datetime | None:
+    if not ts:
+        return None
+    try:
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _cursor_active() -> bool:
+    # Recorded/replayed runs crawl from scratch so a replay asks for the same pages
+    return CURSOR_ENABLED and not replay.replaying() and not replay.recording()
+
+def load_cursor(path: str = CURSOR_PATH) -> dict:
+    """
+    {"high_water": iso|None, "seen": {url: card}, "resume": {"url", "page"}|None}
+    from earlier runs (empty when off or unreadable). `resume` is where a
+    walk that was cut short stopped.
+    """
+    empty = {"high_water": None, "seen": {}, "resume": None}
+    if not _cursor_active():
+        return empty
+    try:
+        with open(path, encoding="utf-8") as f:
+            cursor = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    return {"high_water": cursor.get("high_water"), "seen": cursor.get("seen") or {}, "resume": cursor.get("resume")}
+
+def save_cursor(cursor: dict, now: datetime, path: str = CURSOR_PATH):
+    """Write the cursor back, forgetting stories older than FLM_CURSOR_KEEP_HOURS."""
+    if not _cursor_active():
+        return
+    horizon = now - timedelta(hours=CURSOR_KEEP_HOURS)
+    seen = {
+        url: card for url, card in cursor["seen"].items()
+        if (_parse_ts(card.get("datetime")) or now) >= horizon
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"high_water": cursor["high_water"], "seen": seen, "resume": cursor.get("resume")},
+                  f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def _walk(cursor: dict, oldest: datetime, url: str, first_page: int, max_pages: int, resuming: bool):
+    """
+    One pass over consecutive author pages starting at `url` (page number
+    `first_page`). Returns (new baseball cards, newest timestamp, pages read,
+    where to resume or None when the walk reached known ground).
+
+    From the top, the first card already in the cursor ends the walk, as
+    does a page with nothing new on it. When resuming, stories newer than
+    the gap were seen on earlier runs, so seen cards are skipped and only
+    the high-water mark or `oldest` ends it.
+    """
+    high_water = _parse_ts(cursor["high_water"])
+    scanned: set[str] = set()
+    new, newest = [], None
+    pages, page = 0, first_page
+    for page in range(first_page, first_page + max_pages):
+        try:
+            html = _fetch_author_page(url)
+        except Exception as e:
+            if page == 1:
+                raise
+            # A guessed ?page=N that 404s, a 5xx, or an archive recorded before
+            # pagination: keep what we have and come back to this page next run
+            log.warning(f"Reuters crawl: page {page} unavailable ({e}); stopping at page {page - 1}")
+            return new, newest, pages, {"url": url, "page": page}
+        pages += 1
+        trace.add("reuters.pages")
+        cards = parse_story_cards(html)
+        if not cards:
+            return new, newest, pages, None
+        fresh = 0
+        for card in cards:
+            if card["url"] in scanned:
                 continue
-            paras.append(text)
-    return "\n\n".join(paras)
+            scanned.add(card["url"])
+            ts = _parse_ts(card["datetime"])
+            if (ts and high_water and ts <= high_water) or (ts and ts < oldest):
+                return new, newest, pages, None
+            if card["url"] in cursor["seen"]:
+                if not resuming:
+                    return new, newest, pages, None
+                continue
+            fresh += 1
+            if ts and (newest is None or ts > newest):
+                newest = ts
+            if _is_baseball_url(card["url"]):
+                new.append(card)
+        if not fresh and not resuming:
+            return new, newest, pages, None
+        url = next_page_url(html, page)
+    return new, newest, pages, {"url": url, "page": page + 1}
+
+def crawl_flm(cursor: dict, oldest: datetime, max_pages: int = MAX_PAGES) -> list[dict]:
+    """
+    New baseball story cards, newest first, walking the author pages from
+    the top. Stops at the first card that is already in the cursor, not
+    newer than its high-water mark, or older than `oldest`; at a page with
+    nothing new on it; or after `max_pages`. Other sports are dropped here,
+    before any body is fetched. A page after the first that fails to load
+    ends the walk.
+
+    A walk cut short (by max_pages or a failing page) leaves a resume point
+    in the cursor. Once a later run has caught up at the top, it continues
+    from there, for up to another `max_pages`, until it reaches the
+    high-water mark. The high-water mark only advances when no gap is left.
+    """
+    high_water = _parse_ts(cursor["high_water"])
+    new, newest, pages, resume = _walk(cursor, oldest, AUTHOR_URL, 1, max_pages, resuming=False)
+    if resume is None and cursor.get("resume"):
+        # Newer pages push older stories down, so the old page may now hold
+        # some seen cards; _walk skips those when resuming
+        older, older_newest, more, resume = _walk(
+            cursor, oldest, cursor["resume"]["url"], cursor["resume"]["page"], max_pages, resuming=True
+        )
+        new += older
+        pages += more
+        if older_newest and (newest is None or older_newest > newest):
+            newest = older_newest
+    # A new cut-off replaces an older resume point: walking on from it
+    # skips the seen stories in between and crosses the older gap as well
 
-def fetch_flm_previews(max_articles=15, hours_window: int | None = None):
+    trace.add("reuters.new_cards", len(new))
+    log.info(f"Reuters crawl: {pages} page(s), {len(new)} new baseball stor{'y' if len(new) == 1 else 'ies'}")
+    cursor["resume"] = resume
+    if resume is not None:
+        log.warning(f"Reuters crawl stopped before reaching seen stories; resuming at page {resume['page']} next run")
+    elif newest and (high_water is None or newest > high_water):
+        cursor["high_water"] = newest.isoformat()
+    return new
+
+def fetch_flm_previews(max_articles=15, hours_window: int | None = None, concurrency: int | None = None):
     """
-    Returns list[{title,url,datetime(body tz=Z),body_text}]
+    Returns list[{title,url,datetime(body tz=Z),body_text}], newest first.
     Only recent items within `hours_window` if provided (default from env FLM_HOURS_WINDOW or 36).
+    New stories come from crawl_flm; stories earlier runs already processed
+    come from the cursor (their bodies are article-cache hits, or store reads
+    in read-from-store mode).
+    Bodies are fetched on up to `concurrency` threads (default FLM_CONCURRENCY),
+    paced per host by the shared token bucket.
     """
     if hours_window is None:
         hours_window = int(os.getenv("FLM_HOURS_WINDOW", "36"))
-    items = fetch_flm_list(max_items=max_articles)
-    now = datetime.now(timezone.utc)
-    out = []
-    for it in items:
-        ts = it.get("datetime")
-        keep = True
-        if ts:
-            try:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                keep = (now - dt) <= timedelta(hours=hours_window)
-            except Exception:
-                keep = True
-        if not keep:
-            continue
-        body = fetch_article_body(it["url"])
+    if concurrency is None:
+        concurrency = CONCURRENCY
+    now = replay.now(timezone.utc)
+    oldest = now - timedelta(hours=hours_window)
+    cursor = load_cursor()
+    new = crawl_flm(cursor, oldest)
+
+    known = [card for card in cursor["seen"].values() if (_parse_ts(card.get("datetime")) or now) >= oldest]
+    newest_first = sorted(new + known, key=lambda c: _parse_ts(c.get("datetime")) or now, reverse=True)
+    out = [dict(c) for c in newest_first[:max_articles]]
+
+    # Read-from-store mode still crawls (new previews appear all day) but reuses stored bodies
+    stored = store.load_article_bodies([it["url"] for it in out]) if store.reading() else {}
+    todo = [it for it in out if it["url"] not in stored]
+    if concurrency > 1 and len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            bodies = list(pool.map(fetch_article_body, [it["url"] for it in todo]))
+    else:
+        bodies = [fetch_article_body(it["url"]) for it in todo]
+    for it, body in zip(todo, bodies):
         it["body"] = body
-        out.append(it)
+    for it in out:
+        if it["url"] in stored:
+            it["body"] = stored[it["url"]]
+    store.save_articles(out)
+
+    # Safe even after a cut-short walk: the cursor's resume point covers the stories past it
+    cursor["seen"].update({c["url"]: c for c in new})
+    save_cursor(cursor, now)
     return out
@@ -1,128 +1,188 @@
 # app/schedule.py
-import requests
+import os
 from datetime import datetime
-import pytz
+from functools import lru_cache
+from itertools import groupby
+from typing import Iterator
 import logging
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
+from app import store
+from app.http_cache import get_json, iter_text
+from app.json_stream import iter_schedule_games
+from app.models import Game, intern_team
+
+log = logging.getLogger("mlb.schedule")
 
 MLB_API = "https://statsapi.mlb.com/api/v1"
-TZ_MYT = pytz.timezone("Asia/Kuala_Lumpur")
+CACHE_TTL = float(os.getenv("SCHEDULE_CACHE_TTL", "600"))  # seconds; probables change during the day
 
 def fetch_schedule_for_myt_date(myt_date):
     """
     Fetch schedule for the US slate that corresponds to the given MYT date.
     We query a single date window; StatsAPI interprets internally.
     """
-    url = f"{MLB_API}/schedule"
-    params = {
+    return fetch_schedule_range(myt_date, myt_date)
+
+def fetch_schedule_range(start_date, end_date):
+    """
+    Fetch every slate from start_date to end_date (inclusive) in one call.
+    The response has one entry in "dates" per day with games.
+    Games are upserted into the local store. In read-from-store mode stored
+    slates are reused and only the span of dates never fetched goes to the
+    network (see _stored_slates).
+    """
+    stored, (lo, hi) = _stored_slates(start_date, end_date)
+    if lo is None:
+        return {"dates": stored}
+    schedule_json = get_json(f"{MLB_API}/schedule", params=_params(lo, hi), ttl=CACHE_TTL)
+    store.save_schedule(schedule_json)
+    store.mark_schedule_days(lo, hi)
+    if not stored:
+        return schedule_json
+    outside = [d for d in stored if not lo.isoformat() <= d["date"] <= hi.isoformat()]
+    return {**schedule_json, "dates": sorted(outside + schedule_json.get("dates", []), key=lambda d: d["date"])}
+
+def iter_schedule_slates(start_date, end_date) -> Iterator[tuple[str, list[dict]]]:
+    """
+    Streaming fetch_schedule_range: yields (slate date, raw games) one slate
+    at a time while the response is still being read (app.json_stream), so
+    only one day's games are decoded at once however long the range. Each
+    slate is upserted into the store as it goes by.
+    """
+    stored, (lo, hi) = _stored_slates(start_date, end_date)
+    if lo is None:
+        yield from ((d["date"], d["games"]) for d in stored)
+        return
+    yield from ((d["date"], d["games"]) for d in stored if d["date"] < lo.isoformat())
+    chunks = iter_text(f"{MLB_API}/schedule", params=_params(lo, hi), ttl=CACHE_TTL)
+    for day, pairs in groupby(iter_schedule_games(chunks), key=lambda p: p[0]):
+        games = [g for _, g in pairs]
+        store.save_schedule({"dates": [{"date": day, "games": games}]})
+        yield day, games
+    store.mark_schedule_days(lo, hi)
+    yield from ((d["date"], d["games"]) for d in stored if d["date"] > hi.isoformat())
+
+def _stored_slates(start_date, end_date) -> tuple[list[dict], tuple]:
+    """
+    (stored date blocks, (first, last) date to fetch). Outside read mode
+    nothing is reused and the whole range is fetched; in it, the fetch
+    narrows to the dates never fetched, and is (None, None) when every
+    date is covered.
+    """
+    if not store.reading():
+        return [], (start_date, end_date)
+    missing = store.missing_schedule_days(start_date, end_date)
+    stored = (store.load_schedule(start_date, end_date) or {"dates": []})["dates"]
+    if not missing:
+        return stored, (None, None)
+    return stored, (missing[0], missing[-1])
+
+def _params(start_date, end_date) -> dict:
+    return {
         "sportId": 1,
-        "startDate": myt_date.isoformat(),
-        "endDate": myt_date.isoformat(),
+        "startDate": start_date.isoformat(),
+        "endDate": end_date.isoformat(),
         "hydrate": "probablePitcher,team",
         "language": "en",
     }
-    r = requests.get(url, params=params, timeout=25)
-    r.raise_for_status()
-    return r.json()
+
+def probable_pitcher_ids(schedule_json: dict) -> set[int]:
+    """Collect probable starter IDs straight from the raw schedule payload."""
+    ids = set()
+    for date in schedule_json.get("dates", []):
+        for g in date.get("games", []):
+            for side in ("home", "away"):
+                pid = (g["teams"][side].get("probablePitcher") or {}).get("id")
+                if pid:
+                    ids.add(pid)
+    return ids
 
 def _to_myt_str(game_iso: str) -> str:
     """
     Convert MLB API 'gameDate' string (e.g. '2025-08-19T04:30:00Z')
     into a plain formatted string in MYT.
     """
+    return to_local_str(game_iso, _tz_myt(), "MYT")
+
+@lru_cache(maxsize=None)
+def _tz_myt():
+    import pytz
+
+    return pytz.timezone("Asia/Kuala_Lumpur")
+
+def to_local_str(game_iso: str, tz, label: str | None = None) -> str:
+    """Format a 'gameDate' string in any pytz timezone; label defaults to the zone abbreviation."""
     if not game_iso:
         return "TBD"
     if game_iso.endswith("Z"):
         game_iso = game_iso.replace("Z", "+00:00")
     dt = datetime.fromisoformat(game_iso)  # parse with UTC offset
-    dt_myt = dt.astimezone(TZ_MYT)
-    return dt_myt.strftime("%a %d %b, %I:%M %p MYT")
+    local = dt.astimezone(tz)
+    return local.strftime("%a %d %b, %I:%M %p ") + (label or local.tzname())
 
-def filter_and_annotate_games(schedule_json: dict, team_meta: dict, contender_only: bool = False):
+def filter_and_annotate_games(schedule_json: dict, team_meta: dict, contender_only: bool = False) -> list[Game]:
     """
-    Keep the raw MLB API game dict intact and annotate it with:
-      - home_name, away_name, records
+    Project each raw MLB API game onto a compact Game (app.models) with:
+      - interned home/away Team (name, record, contender flag)
       - contender flags, same_division, same_league
       - probable starters (home_pitcher/away_pitcher) + basic ERA/WHIP placeholders
       - game_iso (raw UTC) and myt_time_str (formatted)
+    The raw payload is left untouched and can be freed.
     """
     games = []
     for date in schedule_json.get("dates", []):
         for g in date.get("games", []):
-            home_t = g["teams"]["home"]
-            away_t = g["teams"]["away"]
-            home_id = home_t["team"]["id"]
-            away_id = away_t["team"]["id"]
-
-            home_meta = team_meta.get(home_id, {})
-            away_meta = team_meta.get(away_id, {})
-
-            # team names (fallback to ID label)
-            g["home_name"] = home_t["team"].get("name") or f"Team {home_id}"
-            g["away_name"] = away_t["team"].get("name") or f"Team {away_id}"
-
-            # contender flags
-            home_is_contender = bool(home_meta.get("is_contender"))
-            away_is_contender = bool(away_meta.get("is_contender"))
-            is_contender_game = home_is_contender or away_is_contender
-
-            if contender_only and not is_contender_game:
+            game = annotate_game(g, team_meta)
+            if game.is_contender or not contender_only:
                 # if you want ZERO filtering, call with contender_only=False
-                continue
-
-            g["home_is_contender"] = home_is_contender
-            g["away_is_contender"] = away_is_contender
-            g["is_contender"] = is_contender_game
-            g["both_contenders"] = home_is_contender and away_is_contender
-
-            # division / league flags
-            same_div = (
-                home_meta.get("div_id") == away_meta.get("div_id")
-                and home_meta.get("div_id") is not None
-            )
-            same_lg = (
-                not same_div
-                and home_meta.get("league_id") == away_meta.get("league_id")
-                and home_meta.get("league_id") is not None
-            )
-            g["same_division"] = same_div
-            g["same_league"] = same_lg
-
-            # records (string if available)
-            home_rec = home_meta.get("record")
-            if not home_rec and home_meta.get("w") is not None and home_meta.get("l") is not None:
-                home_rec = f"{home_meta['w']}-{home_meta['l']}"
-            away_rec = away_meta.get("record")
-            if not away_rec and away_meta.get("w") is not None and away_meta.get("l") is not None:
-                away_rec = f"{away_meta['w']}-{away_meta['l']}"
-            g["home_record"] = home_rec
-            g["away_record"] = away_rec
-
-            # probable pitchers (names + IDs); ERA/WHIP placeholders (main.py will fill real stats)
-            ph = home_t.get("probablePitcher") or {}
-            pa = away_t.get("probablePitcher") or {}
-            g["probable_home_id"] = ph.get("id")
-            g["probable_away_id"] = pa.get("id")
-            g["home_pitcher"] = ph.get("fullName") or "TBD"
-            g["away_pitcher"] = pa.get("fullName") or "TBD"
-            g["home_era"] = ph.get("era") or "—"
-            g["away_era"] = pa.get("era") or "—"
-            g["home_whip"] = ph.get("whip") or "—"
-            g["away_whip"] = pa.get("whip") or "—"
-
-            # kickoff time (raw + formatted)
-            raw_iso = g.get("gameDate")
-            g["game_iso"] = raw_iso
-            try:
-                g["myt_time_str"] = _to_myt_str(raw_iso)
-            except Exception as e:
-                logging.error(f"Failed to parse gameDate for game {g.get('gamePk')}: {raw_iso} ({e})")
-                g["myt_time_str"] = "TBD"
-
-            games.append(g)
-
+                games.append(game)
     return games
+
+def annotate_game(g: dict, team_meta: dict) -> Game:
+    """One raw schedule game → Game (see filter_and_annotate_games)."""
+    home_t = g["teams"]["home"]
+    away_t = g["teams"]["away"]
+    home_id = home_t["team"]["id"]
+    away_id = away_t["team"]["id"]
+
+    home_meta = team_meta.get(home_id, {})
+    away_meta = team_meta.get(away_id, {})
+
+    # team names (fallback to ID label), records and contender flags
+    home = intern_team(home_id, home_t["team"].get("name") or f"Team {home_id}", home_meta)
+    away = intern_team(away_id, away_t["team"].get("name") or f"Team {away_id}", away_meta)
+
+    # division / league flags
+    same_div = home.div_id == away.div_id and home.div_id is not None
+    same_lg = not same_div and home.league_id == away.league_id and home.league_id is not None
+
+    # kickoff time (raw + formatted)
+    raw_iso = g.get("gameDate")
+    try:
+        time_str = _to_myt_str(raw_iso)
+    except Exception as e:
+        log.error(f"Failed to parse gameDate for game {g.get('gamePk')}: {raw_iso} ({e})")
+        time_str = "TBD"
+
+    # probable pitchers (names + IDs); ERA/WHIP placeholders (apply_pitcher_stats fills real stats)
+    ph = home_t.get("probablePitcher") or {}
+    pa = away_t.get("probablePitcher") or {}
+    return Game(
+        game_pk=g.get("gamePk"),
+        game_iso=raw_iso,
+        myt_time_str=time_str,
+        home=home,
+        away=away,
+        is_contender=home.is_contender or away.is_contender,
+        both_contenders=home.is_contender and away.is_contender,
+        same_division=same_div,
+        same_league=same_lg,
+        probable_home_id=ph.get("id"),
+        probable_away_id=pa.get("id"),
+        home_pitcher=ph.get("fullName") or "TBD",
+        away_pitcher=pa.get("fullName") or "TBD",
+        home_era=ph.get("era") or "—",
+        away_era=pa.get("era") or "—",
+        home_whip=ph.get("whip") or "—",
+        away_whip=pa.get("whip") or "—",
+    )
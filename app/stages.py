@@ -0,0 +1,76 @@
+# app/stages.py
+# Tiny dependency-graph runner for the pipeline stages in main.py
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable
+
+from app import trace
+
+log = logging.getLogger("mlb.stages")
+
+
+@dataclass
+class Stage:
+    """
+    A named unit of work. `func` is called with the results of `deps`
+    as positional arguments, in the order the deps are declared.
+    """
+    name: str
+    func: Callable
+    deps: tuple[str, ...] = field(default_factory=tuple)
+
+
+def run_stages(stages: list[Stage], max_workers: int | None = None) -> tuple[dict, dict]:
+    """
+    Run stages as soon as their dependencies have finished; independent
+    stages run at the same time on a thread pool.
+
+    Returns (results, timings) where timings maps stage name -> wall seconds.
+    The first stage failure is re-raised once running stages have settled.
+    """
+    by_name = {s.name: s for s in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("Duplicate stage names")
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage {s.name!r} depends on unknown stage(s): {', '.join(missing)}")
+
+    results: dict = {}
+    timings: dict[str, float] = {}
+    pending = dict(by_name)
+    running = {}
+
+    def _timed(stage: Stage, args: list):
+        t0 = time.perf_counter()
+        try:
+            with trace.span(stage.name, cat="stage", deps=list(stage.deps)), trace.profiled():
+                return stage.func(*args)
+        finally:
+            timings[stage.name] = time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1) as pool:
+        while pending or running:
+            ready = [s for s in pending.values() if all(d in results for d in s.deps)]
+            for s in ready:
+                del pending[s.name]
+                args = [results[d] for d in s.deps]
+                running[pool.submit(_timed, s, args)] = s
+            if not running:
+                raise ValueError(f"Dependency cycle between stages: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                err = fut.exception()
+                if err is not None:
+                    log.error(f"Stage {s.name} failed after {timings.get(s.name, 0.0):.2f}s: {err}")
+                    wait(running)
+                    raise err
+                results[s.name] = fut.result()
+                log.info(f"Stage {s.name} done in {timings[s.name]:.2f}s")
+
+    return results, timings
@@ -1,9 +1,11 @@
 # app/standings.py
 
-import requests
 import logging
 import os
 
+from app import store
+from app.http_cache import get_json
+
 log = logging.getLogger("mlb.standings")
 
 MLB_API = "https://statsapi.mlb.com/api/v1/standings"
@@ -11,23 +13,34 @@ MLB_API = "https://statsapi.mlb.com/api/v1/standings"
 # Defaults, overridable via env
 WC_WINDOW   = float(os.getenv("CONTENDER_WC_CUTOFF_WINDOW", "3.0")) # games behind WC3
 RUNAWAY_GAP = float(os.getenv("RUNAWAY_LEADER_GAP", "5.0"))        # games up = runaway
+CACHE_TTL   = float(os.getenv("STANDINGS_CACHE_TTL", str(3 * 3600))) # seconds; standings move once a night
 
 
-def fetch_team_meta(season: int | None = None) -> dict:
+def fetch_team_meta(season: int | None = None, as_of=None) -> dict:
     """
     Convenience wrapper: fetch standings JSON and build team meta.
+    `as_of` (a date) gives the standings on that day instead of today's.
+    Every snapshot is saved to the local store, which answers first in
+    read-from-store mode.
     """
-    standings_json = fetch_standings_json(season)
-    return build_team_meta(standings_json)
+    snapshot = as_of or store.today()
+    if store.reading():
+        team_meta = store.load_team_meta(snapshot)
+        if team_meta:
+            return team_meta
+    standings_json = fetch_standings_json(season, as_of)
+    team_meta = build_team_meta(standings_json)
+    store.save_team_meta(team_meta, snapshot, season)
+    return team_meta
 
 
-def fetch_standings_json(season: int | None = None) -> dict:
+def fetch_standings_json(season: int | None = None, as_of=None) -> dict:
     params = {"leagueId": "103,104", "standingsTypes": "regularSeason"}
     if season:
         params["season"] = season
-    r = requests.get(MLB_API, params=params, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    if as_of:
+        params["date"] = as_of.isoformat()
+    return get_json(MLB_API, params=params, ttl=CACHE_TTL)
 
 
 def build_team_meta(standings_json: dict) -> dict:
@@ -41,7 +54,6 @@ def build_team_meta(standings_json: dict) -> dict:
     """
 
     team_meta: dict[int, dict] = {}
-    league_cutoffs: dict[int, float] = {}  # league_id -> WC3 GB
 
     # First pass: record division structure & teams
     for rec in standings_json.get("records", []):
@@ -71,28 +83,39 @@ def build_team_meta(standings_json: dict) -> dict:
         leader_id = leader["team"]["id"]
         team_meta[leader_id]["is_div_leader"] = True
 
-    # Compute WC cutoff (3rd WC in each league)
-    for lg in (103, 104):
-        wc_teams = [
-            (tid, meta)
-            for tid, meta in team_meta.items()
-            if meta["league_id"] == lg and not meta["is_div_leader"]
-        ]
-        wc_sorted = sorted(wc_teams, key=lambda x: (-x[1]["w"], x[1]["l"]))
-        if len(wc_sorted) >= 3:
-            cutoff_id, _ = wc_sorted[2]
-            league_cutoffs[lg] = _games_behind_wc(wc_sorted, cutoff_id)
-
-    # Assign GB to WC cutoff
+    # Group once by division and by league; every ordering below is one sort per group
+    divisions: dict[int, list[dict]] = {}
+    wc_pools: dict[int, list[tuple[int, dict]]] = {}
     for tid, meta in team_meta.items():
-        lg = meta["league_id"]
-        if lg not in league_cutoffs:
-            continue
-        cutoff_gb = league_cutoffs[lg]
-        # Only non-division leaders matter for WC distance
+        divisions.setdefault(meta["div_id"], []).append(meta)
         if not meta["is_div_leader"]:
-            meta["gb_wc"] = cutoff_gb  # treat WC3 as reference point
-        else:
+            wc_pools.setdefault(meta["league_id"], []).append((tid, meta))
+
+    # Division leaders: games up on the best other team in the division
+    lead_margin: dict[int, float] = {}
+    for members in divisions.values():
+        leaders = [m for m in members if m["is_div_leader"]]
+        if not leaders:
+            continue
+        leader = leaders[0]
+        chasers = sorted((m for m in members if m is not leader), key=_rank_key)
+        lead_margin[leader["div_id"]] = _games_back(leader, chasers[0]) if chasers else 0.0
+
+    # Wild card: order non-leaders once per league, WC3 is the cutoff line
+    top3_wc: set[int] = set()
+    wc_leagues: set[int] = set()
+    for lg, pool in wc_pools.items():
+        wc_sorted = sorted(pool, key=lambda x: _rank_key(x[1]))
+        if len(wc_sorted) < 3:
+            continue
+        wc_leagues.add(lg)
+        top3_wc.update(tid for tid, _ in wc_sorted[:3])
+        cutoff = wc_sorted[2][1]
+        for _, meta in wc_sorted:
+            # Teams holding a WC spot are 0 back; everyone else is behind WC3
+            meta["gb_wc"] = max(0.0, _games_back(cutoff, meta))
+    for meta in team_meta.values():
+        if meta["is_div_leader"] and meta["league_id"] in wc_leagues:
             meta["gb_wc"] = 0.0  # div leaders are "in" already
 
     # Decide contenders
@@ -100,13 +123,13 @@ def build_team_meta(standings_json: dict) -> dict:
         is_div_leader = meta["is_div_leader"]
 
         # Rule 1: playoff lock
-        in_playoff = is_div_leader or _is_top3_wc(tid, team_meta)
+        in_playoff = is_div_leader or tid in top3_wc
 
         # Rule 2: near WC cutoff (bubble)
         near_wc = meta["gb_wc"] is not None and meta["gb_wc"] <= WC_WINDOW
 
         # Rule 3: filter out runaway division leaders
-        runaway = is_div_leader and _div_lead_margin(team_meta, meta) > RUNAWAY_GAP
+        runaway = is_div_leader and lead_margin.get(meta["div_id"], 0.0) > RUNAWAY_GAP
 
         meta["is_contender"] = (in_playoff or near_wc) and not runaway
 
@@ -120,29 +143,11 @@ def _parse_gb(gb_str: str) -> float:
         return None
 
 
-def _is_top3_wc(team_id: int, team_meta: dict) -> bool:
-    lg = team_meta[team_id]["league_id"]
-    wc_teams = [
-        (tid, meta)
-        for tid, meta in team_meta.items()
-        if meta["league_id"] == lg and not meta["is_div_leader"]
-    ]
-    wc_sorted = sorted(wc_teams, key=lambda x: (-x[1]["w"], x[1]["l"]))
-    return any(tid == team_id for tid, _ in wc_sorted[:3])
-
-
-def _div_lead_margin(team_meta: dict, leader_meta: dict) -> float:
-    """Return games up of a division leader vs 2nd place in division."""
-    div_id = leader_meta["div_id"]
-    same_div = [m for m in team_meta.values() if m["div_id"] == div_id]
-    sorted_div = sorted(same_div, key=lambda m: (-m["w"], m["l"]))
-    if len(sorted_div) < 2:
-        return 0.0
-    second = sorted_div[1]
-    return (leader_meta["w"] - second["w"]) + (second["l"] - leader_meta["l"]) / 2.0
-
-
-def _games_behind_wc(wc_sorted: list, cutoff_id: int) -> float:
-    """Helper to compute GB at WC3 — treat WC3 as reference (0)."""
-    cutoff_meta = [m for tid, m in wc_sorted if tid == cutoff_id][0]
-    return cutoff_meta.get("gb_div", 0.0)
+def _rank_key(meta: dict) -> tuple[int, int]:
+    """Standings order: most wins first, then fewest losses."""
+    return (-meta["w"], meta["l"])
+
+
+def _games_back(ahead: dict, behind: dict) -> float:
+    """Games `behind` trails `ahead` by (negative if it is actually ahead)."""
+    return ((ahead["w"] - behind["w"]) + (behind["l"] - ahead["l"])) / 2.0
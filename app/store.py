@@ -0,0 +1,358 @@
+# app/store.py
+# Local SQLite store of everything the fetchers pull: standings snapshots,
+# games, pitcher stats and Reuters articles. Fetchers upsert into it after
+# every network fetch; with read mode on (--from-store / MLB_STORE_READ=1)
+# they answer from it first and only go to the network for what is missing.
+# Also the place for historical queries (ERA trends, contender history).
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta, timezone
+
+from app import replay
+
+log = logging.getLogger("mlb.store")
+
+STORE_PATH = os.getenv("MLB_STORE_PATH", os.path.join(".cache", "mlb.sqlite"))
+STORE_ENABLED = os.getenv("MLB_STORE", "1") != "0"
+
+_read = os.getenv("MLB_STORE_READ", "0") == "1"
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS standings (
+    as_of         TEXT    NOT NULL,
+    season        INTEGER,
+    team_id       INTEGER NOT NULL,
+    name          TEXT,
+    abbrev        TEXT,
+    league_id     INTEGER,
+    div_id        INTEGER,
+    w             INTEGER,
+    l             INTEGER,
+    gb_div        REAL,
+    gb_wc         REAL,
+    is_div_leader INTEGER,
+    is_contender  INTEGER,
+    PRIMARY KEY (as_of, team_id)
+);
+CREATE INDEX IF NOT EXISTS idx_standings_team ON standings (team_id, as_of);
+
+CREATE TABLE IF NOT EXISTS games (
+    game_pk          INTEGER NOT NULL,
+    us_date          TEXT    NOT NULL,
+    game_date        TEXT,
+    season           INTEGER,
+    home_id          INTEGER,
+    away_id          INTEGER,
+    home_pitcher_id  INTEGER,
+    away_pitcher_id  INTEGER,
+    status           TEXT,
+    payload          TEXT    NOT NULL,
+    PRIMARY KEY (game_pk, us_date)
+);
+CREATE INDEX IF NOT EXISTS idx_games_date ON games (us_date);
+CREATE INDEX IF NOT EXISTS idx_games_home ON games (home_id, us_date);
+CREATE INDEX IF NOT EXISTS idx_games_away ON games (away_id, us_date);
+CREATE INDEX IF NOT EXISTS idx_games_home_pitcher ON games (home_pitcher_id);
+CREATE INDEX IF NOT EXISTS idx_games_away_pitcher ON games (away_pitcher_id);
+
+-- US dates whose whole slate has been fetched (off days have no games rows)
+CREATE TABLE IF NOT EXISTS schedule_days (
+    us_date TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS pitcher_stats (
+    pitcher_id INTEGER NOT NULL,
+    as_of      TEXT    NOT NULL,
+    era        TEXT,
+    whip       TEXT,
+    PRIMARY KEY (pitcher_id, as_of)
+);
+CREATE INDEX IF NOT EXISTS idx_pitcher_stats_date ON pitcher_stats (as_of);
+
+CREATE TABLE IF NOT EXISTS pitcher_game_logs (
+    pitcher_id INTEGER NOT NULL,
+    game_pk    INTEGER NOT NULL,
+    game_date  TEXT    NOT NULL,
+    started    INTEGER,
+    outs       INTEGER,
+    er         INTEGER,
+    h          INTEGER,
+    bb         INTEGER,
+    so         INTEGER,
+    PRIMARY KEY (pitcher_id, game_pk)
+);
+CREATE INDEX IF NOT EXISTS idx_pitcher_game_logs_date ON pitcher_game_logs (pitcher_id, game_date);
+
+CREATE TABLE IF NOT EXISTS articles (
+    url        TEXT PRIMARY KEY,
+    title      TEXT,
+    published  TEXT,
+    descr      TEXT,
+    body       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published);
+"""
+
+
+def configure(read: bool | None = None):
+    """Turn read-from-store mode on/off (None keeps MLB_STORE_READ)."""
+    global _read
+    if read is not None:
+        _read = read
+
+
+def reading() -> bool:
+    return STORE_ENABLED and _read
+
+
+def today() -> date:
+    """Snapshot date for 'current' data (pinned when replaying)."""
+    return replay.now(timezone.utc).date()
+
+
+def _db() -> sqlite3.Connection:
+    """Open (once) the store; callers must hold _lock."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(STORE_PATH) or ".", exist_ok=True)
+        _conn = sqlite3.connect(STORE_PATH, check_same_thread=False)
+        _conn.executescript(_SCHEMA)
+        _conn.commit()
+    return _conn
+
+
+def _write(sql: str, rows: list[tuple]):
+    # Replayed data is archived, not observed: keep it out of the history
+    if not STORE_ENABLED or not rows or replay.replaying():
+        return
+    with _lock:
+        db = _db()
+        db.executemany(sql, rows)
+        db.commit()
+
+
+def _query(sql: str, args: tuple = ()) -> list[tuple]:
+    if not STORE_ENABLED:
+        return []
+    with _lock:
+        return _db().execute(sql, args).fetchall()
+
+
+# --- standings ---
+_META_COLS = ("name", "abbrev", "league_id", "div_id", "w", "l", "gb_div", "gb_wc", "is_div_leader", "is_contender")
+
+
+def save_team_meta(team_meta: dict, as_of: date, season: int | None = None):
+    """Upsert one standings snapshot (build_team_meta output)."""
+    _write(
+        f"""
+        INSERT INTO standings (as_of, season, team_id, {", ".join(_META_COLS)})
+        VALUES ({", ".join("?" * (len(_META_COLS) + 3))})
+        ON CONFLICT (as_of, team_id) DO UPDATE SET
+            {", ".join(f"{c} = excluded.{c}" for c in ("season",) + _META_COLS)}
+        """,
+        [(as_of.isoformat(), season, tid, *(m.get(c) for c in _META_COLS)) for tid, m in team_meta.items()],
+    )
+
+
+def load_team_meta(as_of: date) -> dict | None:
+    """team_id -> meta dict for the snapshot, or None if there is none."""
+    rows = _query(f"SELECT team_id, {', '.join(_META_COLS)} FROM standings WHERE as_of = ?", (as_of.isoformat(),))
+    if not rows:
+        return None
+    out = {}
+    for tid, *vals in rows:
+        meta = dict(zip(_META_COLS, vals))
+        meta["is_div_leader"] = bool(meta["is_div_leader"])
+        meta["is_contender"] = bool(meta["is_contender"])
+        meta["record"] = f"{meta['w']}-{meta['l']}"
+        out[tid] = meta
+    return out
+
+
+def contender_history(team_id: int) -> list[tuple[str, bool, float | None]]:
+    """[(as_of, is_contender, gb_wc)] for one team, oldest first."""
+    rows = _query("SELECT as_of, is_contender, gb_wc FROM standings WHERE team_id = ? ORDER BY as_of", (team_id,))
+    return [(d, bool(c), gb) for d, c, gb in rows]
+
+
+# --- games ---
+def save_schedule(schedule_json: dict):
+    """Upsert every game of a raw schedule payload, keyed by (gamePk, slate date)."""
+    rows = []
+    for block in schedule_json.get("dates", []):
+        for g in block.get("games", []):
+            teams = g.get("teams", {})
+            home, away = teams.get("home", {}), teams.get("away", {})
+            rows.append((
+                g["gamePk"], block["date"], g.get("gameDate"), _int(g.get("season")),
+                (home.get("team") or {}).get("id"), (away.get("team") or {}).get("id"),
+                (home.get("probablePitcher") or {}).get("id"), (away.get("probablePitcher") or {}).get("id"),
+                (g.get("status") or {}).get("detailedState"), json.dumps(g, ensure_ascii=False),
+            ))
+    _write(
+        """
+        INSERT INTO games (game_pk, us_date, game_date, season, home_id, away_id,
+                           home_pitcher_id, away_pitcher_id, status, payload)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (game_pk, us_date) DO UPDATE SET
+            game_date = excluded.game_date, season = excluded.season,
+            home_id = excluded.home_id, away_id = excluded.away_id,
+            home_pitcher_id = excluded.home_pitcher_id, away_pitcher_id = excluded.away_pitcher_id,
+            status = excluded.status, payload = excluded.payload
+        """,
+        rows,
+    )
+
+
+def mark_schedule_days(start: date, end: date):
+    """Record that every slate from start to end (inclusive) has been fetched."""
+    _write(
+        "INSERT OR IGNORE INTO schedule_days (us_date) VALUES (?)",
+        [((start + timedelta(days=i)).isoformat(),) for i in range((end - start).days + 1)],
+    )
+
+
+def missing_schedule_days(start: date, end: date) -> list[date]:
+    """Dates in the range whose slate has never been fetched, oldest first."""
+    have = {d for (d,) in _query(
+        "SELECT us_date FROM schedule_days WHERE us_date BETWEEN ? AND ?", (start.isoformat(), end.isoformat())
+    )}
+    days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+    return [d for d in days if d.isoformat() not in have]
+
+
+def load_schedule(start: date, end: date) -> dict | None:
+    """Rebuild a schedule payload ({"dates": [{date, games}]}) for the range, or None."""
+    rows = _query(
+        "SELECT us_date, payload FROM games WHERE us_date BETWEEN ? AND ? ORDER BY us_date, game_date, game_pk",
+        (start.isoformat(), end.isoformat()),
+    )
+    if not rows:
+        return None
+    dates: dict[str, list] = {}
+    for d, payload in rows:
+        dates.setdefault(d, []).append(json.loads(payload))
+    return {"dates": [{"date": d, "games": games} for d, games in dates.items()]}
+
+
+def _int(v) -> int | None:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+# --- pitcher stats ---
+def save_pitcher_stats(stat_map: dict, as_of: date):
+    _write(
+        """
+        INSERT INTO pitcher_stats (pitcher_id, as_of, era, whip) VALUES (?, ?, ?, ?)
+        ON CONFLICT (pitcher_id, as_of) DO UPDATE SET era = excluded.era, whip = excluded.whip
+        """,
+        [(pid, as_of.isoformat(), s.get("ERA"), s.get("WHIP")) for pid, s in stat_map.items()],
+    )
+
+
+def load_pitcher_stats(ids, as_of: date) -> dict:
+    """{pitcher_id: {"ERA", "WHIP"}} for the ids stored on that date (missing ids are absent)."""
+    ids = [int(i) for i in ids if i]
+    if not ids:
+        return {}
+    marks = ",".join("?" * len(ids))
+    rows = _query(
+        f"SELECT pitcher_id, era, whip FROM pitcher_stats WHERE as_of = ? AND pitcher_id IN ({marks})",
+        (as_of.isoformat(), *ids),
+    )
+    return {pid: {"ERA": era, "WHIP": whip} for pid, era, whip in rows}
+
+
+def era_trend(pitcher_id: int) -> list[tuple[str, str | None]]:
+    """[(as_of, ERA)] for one pitcher, oldest first."""
+    return _query("SELECT as_of, era FROM pitcher_stats WHERE pitcher_id = ? ORDER BY as_of", (pitcher_id,))
+
+
+_LOG_COLS = ("game_pk", "game_date", "started", "outs", "er", "h", "bb", "so")
+
+
+def save_game_logs(logs: dict):
+    """Upsert per-start pitching lines: {pitcher_id: [{game_pk, game_date, started, outs, er, h, bb, so}]}."""
+    _write(
+        f"""
+        INSERT INTO pitcher_game_logs (pitcher_id, {", ".join(_LOG_COLS)})
+        VALUES ({", ".join("?" * (len(_LOG_COLS) + 1))})
+        ON CONFLICT (pitcher_id, game_pk) DO UPDATE SET
+            {", ".join(f"{c} = excluded.{c}" for c in _LOG_COLS[1:])}
+        """,
+        [(pid, *(row[c] for c in _LOG_COLS)) for pid, rows in logs.items() for row in rows],
+    )
+
+
+def load_game_logs(ids, season: int | None = None) -> dict:
+    """{pitcher_id: [log rows, oldest first]} for the stored pitchers among ids (optionally one season)."""
+    ids = [int(i) for i in ids if i]
+    if not ids:
+        return {}
+    rows = _query(
+        f"SELECT pitcher_id, {', '.join(_LOG_COLS)} FROM pitcher_game_logs "
+        f"WHERE pitcher_id IN ({','.join('?' * len(ids))}){_season_clause(season)} "
+        f"ORDER BY pitcher_id, game_date, game_pk",
+        (*ids, *_season_args(season)),
+    )
+    out: dict[int, list] = {}
+    for pid, *vals in rows:
+        out.setdefault(pid, []).append(dict(zip(_LOG_COLS, vals)))
+    return out
+
+
+def last_log_dates(ids, season: int | None = None) -> dict:
+    """{pitcher_id: date of the newest stored game log} (optionally within one season)."""
+    ids = [int(i) for i in ids if i]
+    if not ids:
+        return {}
+    rows = _query(
+        f"SELECT pitcher_id, MAX(game_date) FROM pitcher_game_logs "
+        f"WHERE pitcher_id IN ({','.join('?' * len(ids))}){_season_clause(season)} GROUP BY pitcher_id",
+        (*ids, *_season_args(season)),
+    )
+    return {pid: date.fromisoformat(d) for pid, d in rows}
+
+
+def _season_clause(season: int | None) -> str:
+    # MLB seasons sit inside one calendar year, so the game date's year is the season
+    return "" if season is None else " AND game_date BETWEEN ? AND ?"
+
+
+def _season_args(season: int | None) -> tuple:
+    return () if season is None else (f"{season}-01-01", f"{season}-12-31")
+
+
+# --- articles ---
+def save_articles(articles: list[dict]):
+    _write(
+        """
+        INSERT INTO articles (url, title, published, descr, body) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (url) DO UPDATE SET
+            title = excluded.title, published = excluded.published,
+            descr = excluded.descr, body = COALESCE(excluded.body, articles.body)
+        """,
+        [(a["url"], a.get("title"), a.get("datetime"), a.get("desc"), a.get("body")) for a in articles if a.get("url")],
+    )
+
+
+def load_article_bodies(urls) -> dict[str, str]:
+    """{url: body} for the stored articles among urls that have a body."""
+    urls = [u for u in urls if u]
+    if not urls:
+        return {}
+    rows = _query(
+        f"SELECT url, body FROM articles WHERE body IS NOT NULL AND body != '' AND url IN ({','.join('?' * len(urls))})",
+        tuple(urls),
+    )
+    return dict(rows)
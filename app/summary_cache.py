@@ -0,0 +1,99 @@
+# app/summary_cache.py
+# Content-addressed, size-bounded LRU cache of OpenAI summaries
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from app import trace
+
+log = logging.getLogger("mlb.summary_cache")
+
+CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", os.path.join(".cache", "summaries.sqlite"))
+CACHE_ENABLED = os.getenv("SUMMARY_CACHE", "1") != "0"
+MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX", "2000"))
+
+_conn: sqlite3.Connection | None = None
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _db() -> sqlite3.Connection:
+    """Open (once) the cache DB; callers must hold _lock."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key       TEXT PRIMARY KEY,
+                summary   TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries (last_used)")
+        _conn.commit()
+    return _conn
+
+
+def make_key(model: str, prompt_version: str, title: str | None, hint, body: str) -> str:
+    """sha256 over everything that shapes the summary."""
+    payload = json.dumps([model, prompt_version, title or "", list(hint or ()), body], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> str | None:
+    global _hits, _misses
+    if not CACHE_ENABLED:
+        return None
+    with _lock:
+        db = _db()
+        row = db.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            _misses += 1
+            trace.add("summary_cache.miss")
+            return None
+        _hits += 1
+        trace.add("summary_cache.hit")
+        db.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+        db.commit()
+        return row[0]
+
+
+def put(key: str, summary: str):
+    if not CACHE_ENABLED or not summary:
+        return
+    with _lock:
+        db = _db()
+        db.execute(
+            "INSERT OR REPLACE INTO summaries (key, summary, last_used) VALUES (?, ?, ?)",
+            (key, summary, time.time()),
+        )
+        # Evict least recently used rows beyond the size bound
+        db.execute(
+            """
+            DELETE FROM summaries WHERE key IN (
+                SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (MAX_ENTRIES,),
+        )
+        db.commit()
+
+
+def stats() -> tuple[int, int]:
+    """(hits, misses) since process start."""
+    return _hits, _misses
+
+
+def log_stats():
+    hits, misses = stats()
+    if hits or misses:
+        log.info(f"Summary cache: {hits} hit(s), {misses} miss(es)")
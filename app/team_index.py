@@ -0,0 +1,103 @@
+# app/team_index.py
+# Alias index built once from app/teams.TEAMS: one combined regex finds every
+# team mention in a single pass over the text.
+
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import combinations
+
+from app.teams import TEAMS, FULL_TO_ALIASES
+
+
+def _alias_regex(alias: str) -> str:
+    return re.escape(alias).replace(r"\ ", r"\s+")
+
+
+# alias (lowercase) -> canonical full name
+ALIAS_INDEX: dict[str, str] = {
+    alias: full for full, aliases in FULL_TO_ALIASES.items() for alias in aliases
+}
+FULL_NAMES: dict[str, str] = {t["full"].lower(): t["full"] for t in TEAMS}
+# 2-3 letter codes ("bal", "sd"); several are everyday words ("as", "was", "min")
+ABBREVIATIONS = frozenset(a for a in ALIAS_INDEX if a.isalpha() and len(a) <= 3)
+
+# Longest aliases first so "new york yankees" wins over "yankees" at the same position
+MENTION_RE = re.compile(
+    r"(?<!\w)(?:"
+    + "|".join(_alias_regex(a) for a in sorted(ALIAS_INDEX, key=len, reverse=True))
+    + r")(?!\w)",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=None)
+def _nested_counts() -> dict[str, Counter]:
+    """
+    For each alias, the mentions it implies: a hit on "st. louis cardinals"
+    also contains "st. louis" and "cardinals". Counting those keeps totals in
+    line with the old one-regex-per-alias scan. Built on first use (it is
+    the bulk of this module's import cost).
+    """
+    out = {}
+    for alias in ALIAS_INDEX:
+        c = Counter()
+        for other, full in ALIAS_INDEX.items():
+            hits = len(re.findall(rf"(?<!\w){_alias_regex(other)}(?!\w)", alias))
+            if hits:
+                c[full] += hits
+        out[alias] = c
+    return out
+
+
+
+def _normalize(match_text: str) -> str:
+    return " ".join(match_text.lower().split())
+
+
+def iter_mentions(text: str):
+    """Yield (alias, full_name) for every non-overlapping team mention."""
+    for m in MENTION_RE.finditer(text or ""):
+        alias = _normalize(m.group(0))
+        yield alias, ALIAS_INDEX[alias]
+
+
+def count_mentions(text: str) -> dict[str, int]:
+    """Mentions per team (every team present, zero if unmentioned)."""
+    counts = {t["full"]: 0 for t in TEAMS}
+    for alias, _ in iter_mentions(text):
+        for full, n in _nested_counts()[alias].items():
+            counts[full] += n
+    return counts
+
+
+def mentioned_teams(text: str, full_names_only: bool = False, abbreviations: bool = True) -> set[str]:
+    """
+    Teams mentioned at all; optionally only by their full canonical name, or
+    by name or nickname without counting the short abbreviations.
+    """
+    return {
+        full for alias, full in iter_mentions(text)
+        if (not full_names_only or alias == full.lower())
+        and (abbreviations or alias not in ABBREVIATIONS)
+    }
+
+
+@lru_cache(maxsize=256)
+def resolve_team(name: str) -> str | None:
+    """Map a team display name (e.g. from StatsAPI) to its canonical full name."""
+    if not name:
+        return None
+    n = _normalize(name)
+    if n in FULL_NAMES:
+        return FULL_NAMES[n]
+    for alias, full in iter_mentions(n):
+        if alias == "st. louis" and "cardinals" not in n:
+            continue
+        return full
+    return None
+
+
+def team_pairs(teams) -> list[frozenset]:
+    """All unordered pairs from a collection of team names."""
+    return [frozenset(p) for p in combinations(sorted(teams), 2)]
@@ -0,0 +1,182 @@
+# app/trace.py
+# Lightweight run tracing: timed spans, HTTP/OpenAI events and counters,
+# exported as one JSON file per run (optionally Chrome trace-event format,
+# loadable in chrome://tracing or Perfetto), plus an opt-in cProfile hook.
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+log = logging.getLogger("mlb.trace")
+
+_enabled = False
+_path: str | None = None
+_format = "json"
+_t0 = time.perf_counter()
+_started_at = datetime.now(timezone.utc)
+_events: list[dict] = []
+_counters: dict[str, float] = {}
+_lock = threading.Lock()
+_profiles: list[cProfile.Profile] | None = None   # per-thread profiles while profiling() is active
+
+
+def configure(path: str | None = None, fmt: str | None = None):
+    """Enable tracing to `path` ("json" or "chrome" format); no-op without a path."""
+    global _enabled, _path, _format
+    if not path:
+        return
+    _enabled, _path = True, path
+    _format = (fmt or os.getenv("MLB_TRACE_FORMAT", "json")).lower()
+    if _format not in ("json", "chrome"):
+        raise ValueError(f"Unknown trace format: {_format}")
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _now_us() -> float:
+    return (time.perf_counter() - _t0) * 1e6
+
+
+def _emit(event: dict):
+    with _lock:
+        _events.append(event)
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **attrs):
+    """Time the enclosed block; attrs end up in the event's args."""
+    if not _enabled:
+        yield attrs
+        return
+    start = _now_us()
+    try:
+        yield attrs
+    finally:
+        _emit({
+            "name": name, "cat": cat, "ts": start, "dur": _now_us() - start,
+            "tid": threading.get_ident(), "args": attrs,
+        })
+
+
+def add(counter: str, value: float = 1):
+    """Accumulate a run-level counter (games, tokens, sleep seconds…)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[counter] = _counters.get(counter, 0) + value
+
+
+def record_http(url: str, status: int | None, nbytes: int, cache: str, elapsed_s: float):
+    """One HTTP fetch as seen by the cache layer (cache: hit/miss/revalidated/bypass/replay/stream)."""
+    if not _enabled:
+        return
+    _emit({
+        "name": "GET", "cat": "http", "ts": _now_us() - elapsed_s * 1e6, "dur": elapsed_s * 1e6,
+        "tid": threading.get_ident(),
+        "args": {"url": url, "status": status, "bytes": nbytes, "cache": cache},
+    })
+    add("http.requests")
+    add(f"http.cache.{cache}")
+    add("http.bytes", nbytes)
+
+
+def summary() -> dict:
+    """Plain JSON view of the run: spans, HTTP events and counters."""
+    with _lock:
+        events = list(_events)
+        counters = dict(_counters)
+    return {
+        "started_at": _started_at.isoformat(),
+        "duration_s": round(time.perf_counter() - _t0, 3),
+        "counters": counters,
+        "spans": [
+            {"name": e["name"], "cat": e["cat"], "start_ms": round(e["ts"] / 1000, 3),
+             "duration_ms": round(e["dur"] / 1000, 3), "thread": e["tid"], **e["args"]}
+            for e in sorted(events, key=lambda e: e["ts"])
+        ],
+    }
+
+
+def chrome_trace() -> dict:
+    """Chrome trace-event format ("X" complete events + a final counter sample)."""
+    pid = os.getpid()
+    with _lock:
+        events = [{"ph": "X", "pid": pid, **e} for e in _events]
+        counters = dict(_counters)
+    events.append({"name": "counters", "ph": "C", "ts": _now_us(), "pid": pid, "tid": 0, "args": counters})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write(path: str | None = None) -> str | None:
+    """Write the trace file (if tracing is on) and return its path."""
+    path = path or _path
+    if not _enabled or not path:
+        return None
+    data = chrome_trace() if _format == "chrome" else summary()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1 if _format == "json" else None)
+    log.info(f"Run trace written to {path} ({_format})")
+    return path
+
+
+@contextmanager
+def profiling(path: str | None = None):
+    """
+    cProfile the enclosed block when `path` (or MLB_PROFILE) is set. Work
+    run under profiled() on other threads (the pipeline stages) is merged
+    into the same stats file.
+    """
+    global _profiles
+    path = path or os.getenv("MLB_PROFILE")
+    if not path:
+        yield
+        return
+    _profiles = []
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        with _lock:
+            extra, _profiles = _profiles, None
+        stats = pstats.Stats(prof)
+        for p in extra:
+            stats.add(p)
+        stats.dump_stats(path)
+        log.info(f"cProfile stats written to {path} (view with: python -m pstats {path})")
+
+
+@contextmanager
+def profiled():
+    """
+    Profile the enclosed block on the calling thread while profiling() is
+    active. cProfile only hooks the thread that enables it, so pool workers
+    need their own profiler.
+    """
+    if _profiles is None:
+        yield
+        return
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        # Python 3.12+: the run-level profiler already covers every thread
+        prof = None
+    try:
+        yield
+    finally:
+        if prof is not None:
+            prof.disable()
+            with _lock:
+                if _profiles is not None:
+                    _profiles.append(prof)
@@ -0,0 +1 @@
+# pipeline benchmarks: python -m benchmarks.bench_pipeline --help
@@ -0,0 +1,310 @@
+# benchmarks/bench_pipeline.py
+# Per-stage pipeline benchmarks on synthetic (and optionally recorded) payloads.
+#
+#   python -m benchmarks.bench_pipeline                  # full sweep, JSON to stdout
+#   python -m benchmarks.bench_pipeline --quick --out bench.json
+#   python -m benchmarks.bench_pipeline --replay fixtures/run.json.gz
+#
+# Every case reports throughput (items/s), p50/p95 latency and peak traced
+# memory as JSON so two runs can be diffed.
+
+import argparse
+import copy
+import gzip
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import narrative  # noqa: E402
+from app.emailer import prepare_email_context, render_newsletter  # noqa: E402
+from app.pitchers import apply_pitcher_stats, parse_game_logs, parse_pitcher_stats, recent_form  # noqa: E402
+from app.reuters_flm import AUTHOR_URL, parse_article_body, parse_flm_list  # noqa: E402
+from app.schedule import filter_and_annotate_games  # noqa: E402
+from app.standings import build_team_meta  # noqa: E402
+from benchmarks import synthetic  # noqa: E402
+
+DAY_SIZES = (1, 7, 30, 183)           # one slate … a full regular season
+ARTICLE_SIZES = (10, 100, 1000)
+PITCHER_SIZES = (10, 100, 1000)
+QUICK_DAY_SIZES = (1, 7)
+QUICK_ARTICLE_SIZES = (10, 100)
+# Third-party packages whose load cost the CLI defers until their stage runs
+HEAVY_IMPORTS = ("openai", "bs4", "jinja2", "requests", "pytz")
+
+
+def _percentile(sorted_vals: list[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def measure(name: str, size: int, items: int, setup, fn, repeat: int, source: str = "synthetic") -> dict:
+    """
+    Time `fn(*setup())` `repeat` times (setup excluded), then once more under
+    tracemalloc for the peak allocation.
+    """
+    latencies = []
+    for _ in range(repeat):
+        args = setup()
+        t0 = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t0)
+
+    args = setup()
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    return {
+        "case": name,
+        "source": source,
+        "size": size,
+        "items": items,
+        "repeat": repeat,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "min_ms": round(latencies[0] * 1000, 3),
+        "throughput_per_s": round(items / p50, 1) if p50 > 0 else None,
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+@contextmanager
+def stub_summarizer():
+    """Swap the OpenAI summarizer for a local, deterministic one."""
+    original = narrative._summarize_text
+
+    def _stub(text, *args, **kwargs):
+        return (text or "").split(". ")[0][:200]
+
+    narrative._summarize_text = _stub
+    try:
+        yield
+    finally:
+        narrative._summarize_text = original
+
+
+def _json_copy(payload):
+    """Fresh copy of a raw payload per iteration."""
+    blob = json.dumps(payload)
+    return lambda: json.loads(blob)
+
+
+def synthetic_cases(day_sizes, article_sizes, pitcher_sizes, repeat: int) -> list[dict]:
+    results = []
+    meta = build_team_meta(synthetic.standings())
+
+    for days in day_sizes:
+        snapshots = [synthetic.standings(seed) for seed in range(days)]
+        results.append(measure(
+            "build_team_meta", days, days, lambda: (snapshots,),
+            lambda snaps: [build_team_meta(s) for s in snaps], repeat,
+        ))
+
+        sched = _json_copy(synthetic.schedule(days))
+        n_games = 15 * days
+        results.append(measure(
+            "filter_and_annotate_games", days, n_games, lambda: (sched(), meta),
+            lambda s, m: filter_and_annotate_games(s, m, contender_only=False), repeat,
+        ))
+
+        games = filter_and_annotate_games(sched(), meta, contender_only=False)
+        stats = parse_pitcher_stats(synthetic.people(len(games) * 2))
+        results.append(measure(
+            "render_newsletter", days, n_games,
+            lambda: (prepare_email_context(games, date(2025, 6, 1)),),
+            render_newsletter, repeat,
+        ))
+        results.append(measure(
+            "apply_pitcher_stats", days, n_games, lambda: ([copy.copy(g) for g in games], stats),
+            apply_pitcher_stats, repeat,
+        ))
+
+    for n in pitcher_sizes:
+        payload = synthetic.people(n)
+        results.append(measure("parse_pitcher_stats", n, n, lambda: (payload,), parse_pitcher_stats, repeat))
+        results.append(measure(
+            "game_logs_recent_form", n, n, lambda: (payload,),
+            lambda p: [recent_form(rows) for rows in parse_game_logs(p).values()], repeat,
+        ))
+
+    for n in article_sizes:
+        page = synthetic.author_page(n)
+        results.append(measure(
+            "parse_flm_list", n, n, lambda: (page,), lambda html: parse_flm_list(html, max_items=n), repeat,
+        ))
+
+        pages = [synthetic.article_html(i) for i in range(n)]
+        results.append(measure(
+            "parse_article_body", n, n, lambda: (pages,), lambda ps: [parse_article_body(p) for p in ps],
+            max(1, repeat // 3),
+        ))
+
+        day = synthetic.schedule(1)
+        arts = synthetic.articles(n, day)
+        slate = filter_and_annotate_games(day, meta, contender_only=False)
+        with stub_summarizer():
+            results.append(measure(
+                "match_and_summarize", n, n, lambda: ([copy.copy(g) for g in slate], arts),
+                narrative.match_and_summarize, repeat,
+            ))
+    return results
+
+
+def recorded_cases(archive_path: str, repeat: int) -> list[dict]:
+    """Benchmark the same stages on payloads captured with `main.py --record`."""
+    with gzip.open(archive_path, "rt", encoding="utf-8") as f:
+        http = json.load(f).get("http", {})
+
+    results = []
+    standings = [json.loads(v) for k, v in http.items() if "/standings" in k]
+    schedules = [json.loads(v) for k, v in http.items() if "/schedule" in k]
+    people = [json.loads(v) for k, v in http.items() if "/people" in k]
+    authors = [v for k, v in http.items() if k.startswith(AUTHOR_URL)]
+    articles = [v for k, v in http.items() if "/sports/baseball/" in k]
+
+    meta = build_team_meta(standings[0]) if standings else {}
+    if standings:
+        results.append(measure("build_team_meta", len(standings), len(standings), lambda: (standings,),
+                               lambda snaps: [build_team_meta(s) for s in snaps], repeat, "recorded"))
+    for sched in schedules:
+        fresh = _json_copy(sched)
+        n_games = sum(len(d.get("games", [])) for d in sched.get("dates", []))
+        results.append(measure("filter_and_annotate_games", len(sched.get("dates", [])), n_games,
+                               lambda: (fresh(), meta), lambda s, m: filter_and_annotate_games(s, m), repeat, "recorded"))
+        games = filter_and_annotate_games(fresh(), meta)
+        results.append(measure("render_newsletter", len(sched.get("dates", [])), n_games,
+                               lambda: (prepare_email_context(games, date.today()),),
+                               render_newsletter, repeat, "recorded"))
+    for payload in people:
+        n = len(payload.get("people", []))
+        results.append(measure("parse_pitcher_stats", n, n, lambda: (payload,), parse_pitcher_stats, repeat, "recorded"))
+    for page in authors:
+        results.append(measure("parse_flm_list", 1, 1, lambda: (page,), parse_flm_list, repeat, "recorded"))
+    if articles:
+        results.append(measure("parse_article_body", len(articles), len(articles), lambda: (articles,),
+                               lambda ps: [parse_article_body(p) for p in ps], repeat, "recorded"))
+    return results
+
+
+def _importtime_rows(code: str) -> list[tuple[str, int]]:
+    """(indented module name, cumulative µs) rows of `python -X importtime -c code`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip()[1:], int(cumulative)))  # drop the column's separator space
+    return rows
+
+
+def import_times(module: str = "main", runs: int = 3) -> dict:
+    """
+    `python -X importtime -c "import <module>"` in a fresh interpreter (best
+    of `runs`): import time, the slowest direct imports and which of
+    HEAVY_IMPORTS were loaded eagerly. Modules a bare interpreter already
+    loads (site hooks etc.) are left out.
+    """
+    baseline = {name.strip() for name, _ in _importtime_rows("pass")}
+    prefix = "  "  # direct imports of `module` are indented one level
+    best = None
+    for _ in range(runs):
+        rows = _importtime_rows(f"import {module}")
+        # Children are printed before their parent: the rows of `import
+        # module` run from the previous top-level row to its own.
+        end = next((i for i, (name, _) in enumerate(rows) if name == module), len(rows) - 1)
+        start = max((i for i, (name, _) in enumerate(rows[:end]) if not name.startswith(" ")), default=-1) + 1
+        mine = rows[start:end + 1]
+        direct = [(name.strip(), us) for name, us in mine if name.startswith(prefix) and not name.startswith(prefix * 2)]
+        total = (mine[-1][1] if mine else 0) - sum(us for name, us in direct if name in baseline)
+        if best is None or total < best[0]:
+            best = (total, mine, direct)
+    total, rows, direct = best
+    top = sorted(((n, us) for n, us in direct if n not in baseline), key=lambda r: -r[1])[:10]
+    loaded = {name.strip().split(".")[0] for name, _ in rows} - baseline
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 1),
+        "top": [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in top],
+        "eager_heavy_imports": [m for m in HEAVY_IMPORTS if m in loaded],
+    }
+
+
+def print_table(results: list[dict], stream=sys.stderr):
+    print(f"{'case':28} {'src':9} {'size':>6} {'p50 ms':>10} {'p95 ms':>10} {'items/s':>12} {'peak KB':>10}", file=stream)
+    for r in results:
+        print(
+            f"{r['case']:28} {r['source']:9} {r['size']:>6} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} "
+            f"{(r['throughput_per_s'] or 0):>12.1f} {r['peak_mem_kb']:>10.1f}",
+            file=stream,
+        )
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark pipeline stages")
+    p.add_argument("--quick", action="store_true", help="small sizes only (CI smoke run)")
+    p.add_argument("--repeat", type=int, default=7, help="timed iterations per case")
+    p.add_argument("--replay", metavar="ARCHIVE", help="also benchmark payloads from a recorded run")
+    p.add_argument("--out", help="write JSON here instead of stdout")
+    p.add_argument("--no-import-time", action="store_true", help="skip the -X importtime measurement")
+    args = p.parse_args(argv)
+
+    os.chdir(ROOT)  # render_template loads templates/ relative to the repo root
+    if args.quick:
+        sizes = (QUICK_DAY_SIZES, QUICK_ARTICLE_SIZES, QUICK_ARTICLE_SIZES)
+    else:
+        sizes = (DAY_SIZES, ARTICLE_SIZES, PITCHER_SIZES)
+
+    results = synthetic_cases(*sizes, repeat=args.repeat)
+    if args.replay:
+        results += recorded_cases(args.replay, repeat=args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    if not args.no_import_time:
+        report["import_time"] = import_times()
+    print_table(results)
+    if "import_time" in report:
+        imp = report["import_time"]
+        eager = ", ".join(imp["eager_heavy_imports"]) or "none"
+        print(f"\nimport main: {imp['total_ms']:.1f} ms (eager heavy imports: {eager})", file=sys.stderr)
+        for row in imp["top"][:5]:
+            print(f"  {row['module']:26} {row['cumulative_ms']:>8.1f} ms", file=sys.stderr)
+    blob = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(blob + "\n")
+    else:
+        print(blob)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
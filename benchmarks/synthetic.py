@@ -0,0 +1,174 @@
+# benchmarks/synthetic.py
+# Deterministic synthetic StatsAPI / Reuters payloads shaped like the real ones
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from app.teams import TEAMS
+
+TEAM_IDS = list(range(108, 108 + len(TEAMS)))
+LEAGUES = (103, 104)
+
+
+def _team(tid: int) -> dict:
+    return {"id": tid, "name": TEAMS[tid - TEAM_IDS[0]]["full"]}
+
+
+def standings(seed: int = 0) -> dict:
+    """One regularSeason standings payload: 2 leagues x 3 divisions x 5 teams."""
+    rng = random.Random(seed)
+    records = []
+    tids = iter(TEAM_IDS)
+    for lg in LEAGUES:
+        for d in range(3):
+            rows = []
+            for _ in range(5):
+                w = rng.randint(55, 95)
+                rows.append({"team": _team(next(tids)), "wins": w, "losses": 150 - w, "gamesBack": "-"})
+            rows.sort(key=lambda r: (-r["wins"], r["losses"]))
+            lead = rows[0]
+            for r in rows[1:]:
+                r["gamesBack"] = str(((lead["wins"] - r["wins"]) + (r["losses"] - lead["losses"])) / 2.0)
+            records.append({"division": {"id": 200 + lg * 10 + d}, "league": {"id": lg}, "teamRecords": rows})
+    return {"records": records}
+
+
+def schedule(days: int, start: date = date(2025, 4, 1), seed: int = 0) -> dict:
+    """`days` slates of 15 games each, hydrated with probablePitcher + team."""
+    rng = random.Random(seed)
+    dates = []
+    pk = 770000
+    for i in range(days):
+        d = start + timedelta(days=i)
+        ids = TEAM_IDS[:]
+        rng.shuffle(ids)
+        games = []
+        for k in range(15):
+            away, home = ids[2 * k], ids[2 * k + 1]
+            pk += 1
+            games.append({
+                "gamePk": pk,
+                "gameDate": f"{d.isoformat()}T{rng.choice(['17', '23', '02'])}:05:00Z",
+                "officialDate": d.isoformat(),
+                "status": {"abstractGameState": "Preview", "detailedState": "Scheduled"},
+                "venue": {"id": home, "name": f"Park {home}"},
+                "teams": {
+                    side: {
+                        "team": {**_team(tid), "abbreviation": str(tid), "league": {"id": 103}, "division": {"id": 201}},
+                        "leagueRecord": {"wins": 70, "losses": 60, "pct": ".538"},
+                        "probablePitcher": {"id": 600000 + tid * 10 + i % 5, "fullName": f"Starter {tid}-{i % 5}"},
+                    }
+                    for side, tid in (("away", away), ("home", home))
+                },
+            })
+        dates.append({"date": d.isoformat(), "totalGames": len(games), "games": games})
+    return {"dates": dates}
+
+
+def people(n: int, seed: int = 0, starts: int = 25) -> dict:
+    """`people` payload for n pitchers hydrated with season stats and a `starts`-long game log."""
+    rng = random.Random(seed)
+    return {"people": [
+        {
+            "id": 600000 + i,
+            "fullName": f"Starter {i}",
+            "stats": [{
+                "type": {"displayName": "season"},
+                "group": {"displayName": "pitching"},
+                "splits": [{"season": "2025", "stat": {
+                    "era": f"{rng.uniform(2, 6):.2f}", "whip": f"{rng.uniform(0.9, 1.6):.2f}",
+                    "inningsPitched": f"{rng.randint(40, 180)}.1", "strikeOuts": rng.randint(30, 200),
+                }}],
+            }, {
+                "type": {"displayName": "gameLog"},
+                "group": {"displayName": "pitching"},
+                "splits": [
+                    {
+                        "date": (date(2025, 3, 28) + timedelta(days=5 * k)).isoformat(),
+                        "game": {"gamePk": 770000 + i * starts + k},
+                        "stat": {
+                            "gamesStarted": 1, "inningsPitched": f"{rng.randint(3, 7)}.{rng.randint(0, 2)}",
+                            "earnedRuns": rng.randint(0, 5), "hits": rng.randint(2, 9),
+                            "baseOnBalls": rng.randint(0, 4), "strikeOuts": rng.randint(2, 11),
+                        },
+                    }
+                    for k in range(starts)
+                ],
+            }],
+        }
+        for i in range(n)
+    ]}
+
+
+def _padding(tag: str, n: int) -> str:
+    return f"<{tag}>related link text</{tag}>" * n
+
+
+def author_page(cards: int, now: datetime | None = None) -> str:
+    """Author page HTML with `cards` story cards (2 in 3 baseball)."""
+    now = now or datetime.now(timezone.utc)
+    lis = []
+    for i in range(cards):
+        away, home = TEAMS[(2 * i) % 30]["full"], TEAMS[(2 * i + 1) % 30]["full"]
+        sport = "baseball" if i % 3 else "basketball"
+        ts = (now - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        lis.append(
+            f'<li data-testid="StoryCard" class="story-card"><div class="media">'
+            f'<a data-testid="TitleLink" href="/sports/{sport}/{away.split()[-1].lower()}-{home.split()[-1].lower()}-{i}-2025-06-01/">'
+            f'<span data-testid="TitleHeading">{away.split()[-1]} at {home.split()[-1]}: preview {i}</span></a>'
+            f'<time datetime="{ts}">{i} hours ago</time>'
+            f'<p data-testid="Description">Field Level Media preview number {i}.</p></div></li>'
+        )
+    return (
+        "<html><head>" + "<script>window.__x = {};</script>" * 100 + "</head><body>"
+        + "<nav>" + _padding("a", 300) + "</nav><ul>" + "".join(lis) + "</ul>"
+        + "<footer>" + _padding("div", 1000) + "</footer></body></html>"
+    )
+
+
+def article_html(i: int, paras: int = 12) -> str:
+    """A Reuters-like article page: lots of chrome around a small body."""
+    away, home = TEAMS[(2 * i) % 30]["full"], TEAMS[(2 * i + 1) % 30]["full"]
+    body = [f"The {away} visit the {home} on Tuesday night to open a three-game series."]
+    body += [
+        f"Paragraph {k}: the {home.split()[-1]} right-hander carries a 3.{k}1 ERA and 1.1{k} WHIP "
+        f"into the start, with {k + 4} strikeouts in his last outing against the {away.split()[-1]}."
+        for k in range(paras)
+    ]
+    body.append("--Field Level Media")
+    divs = "".join(
+        f'<div data-testid="paragraph-{k}" class="article-body__paragraph__2-BtD text__text__1FZLe">{p}</div>'
+        for k, p in enumerate(body)
+    )
+    return (
+        "<html><head>" + "<script>window.__y = {};</script>" * 150 + "</head><body>"
+        + "<nav>" + _padding("a", 400) + "</nav><article><header><h1>Preview</h1></header>"
+        + f'<div class="article-body__content__17Yit">{divs}</div></article>'
+        + "<aside>" + _padding("div", 800) + "</aside></body></html>"
+    )
+
+
+def articles(n: int, sched: dict | None = None) -> list[dict]:
+    """
+    Already-scraped article dicts as fetch_flm_previews returns them, one per
+    matchup of the first slate in `sched` (default: `schedule(1)`), cycling
+    through its games when n is larger.
+    """
+    games = (sched or schedule(1))["dates"][0]["games"]
+    out = []
+    for i in range(n):
+        g = games[i % len(games)]["teams"]
+        away, home = g["away"]["team"]["name"], g["home"]["team"]["name"]
+        body = "\n\n".join([
+            f"The {away} visit the {home} on Tuesday night.",
+            f"The {home.split()[-1]} have won four straight; the {away.split()[-1]} have dropped three of five.",
+            "Filler paragraph about the bullpen and lineup. " * 5,
+        ])
+        out.append({
+            "title": f"{away.split()[-1]} at {home.split()[-1]}: preview {i}",
+            "url": f"https://www.reuters.com/sports/baseball/preview-{i}/",
+            "datetime": "2025-06-01T12:00:00Z",
+            "desc": "",
+            "body": body,
+        })
+    return out
@@ -1,17 +1,20 @@
 # main.py
 
+import argparse
 import os
-from datetime import datetime
+from datetime import date
 from dotenv import load_dotenv
-import pytz
 
+from app import incremental, replay, store, trace
 from app.logging_utils import get_logger
+from app.models import clear_teams
 from app.standings import fetch_team_meta
-from app.schedule import fetch_schedule_for_myt_date, filter_and_annotate_games
-from app.pitchers import fetch_pitcher_stats
+from app.schedule import fetch_schedule_for_myt_date, filter_and_annotate_games, probable_pitcher_ids
+from app.pitchers import fetch_pitcher_stats, apply_pitcher_stats
 from app.reuters_flm import fetch_flm_previews
 from app.narrative import match_and_summarize
-from app.emailer import render_template, send_email
+from app.emailer import prepare_email_context, render_newsletter, render_template, send_email
+from app.stages import Stage, run_stages
 
 
 def get_target_dates():
@@ -19,10 +22,12 @@ def get_target_dates():
     Map MYT 'today' into the correct US slate date.
     Returns both (target_myt_date, target_us_date).
     """
+    import pytz
+
     MYT = pytz.timezone("Asia/Kuala_Lumpur")
     US_EAST = pytz.timezone("US/Eastern")
 
-    now_myt = datetime.now(MYT)
+    now_myt = replay.now(MYT)
     target_myt_date = now_myt.date()                   # newsletter header
     target_us_date = now_myt.astimezone(US_EAST).date()  # MLB schedule date
 
@@ -37,79 +42,153 @@ def _val(*candidates, default="—"):
     return default
 
 
-def prepare_email_context(games, myt_date):
-    """
-    Pass the annotated game dicts straight to the template.
-    Splits by contender flag but does not rename keys.
-    """
-    contender_games = [g for g in games if g.get("is_contender")]
-    other_games = [g for g in games if not g.get("is_contender")]
-
-    target_date_str = myt_date.strftime("%a %d %b %Y")
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="MLB contender matchups newsletter")
+    p.add_argument("--from", dest="date_from", type=date.fromisoformat,
+                   help="backfill: first US slate date (YYYY-MM-DD)")
+    p.add_argument("--to", dest="date_to", type=date.fromisoformat,
+                   help="backfill: last US slate date (YYYY-MM-DD), defaults to --from")
+    p.add_argument("--out", default="backfill", help="backfill: output directory for the HTML files")
+    p.add_argument("--workers", type=int, default=None, help="backfill: render processes (default: CPU count)")
+    p.add_argument("--record", metavar="ARCHIVE", default=os.getenv("MLB_RECORD"),
+                   help="snapshot every external response into ARCHIVE (.json.gz)")
+    p.add_argument("--replay", metavar="ARCHIVE", default=os.getenv("MLB_REPLAY"),
+                   help="serve external responses from ARCHIVE instead of the network (no email is sent)")
+    p.add_argument("--trace", metavar="PATH", default=os.getenv("MLB_TRACE"),
+                   help="write a per-run JSON trace (MLB_TRACE_FORMAT=chrome for chrome://tracing)")
+    p.add_argument("--profile", metavar="PATH", default=os.getenv("MLB_PROFILE"),
+                   help="cProfile the run (every pipeline stage thread) and dump pstats to PATH")
+    p.add_argument("--editions", metavar="JSON", default=os.getenv("EDITIONS_FILE"),
+                   help="also render the personalised editions listed in JSON (timezone/contenders/teams/recipients)")
+    p.add_argument("--from-store", action="store_true", default=os.getenv("MLB_STORE_READ", "0") == "1",
+                   help="answer standings/schedule/pitcher/article lookups from the local SQLite store first")
+    p.add_argument("--daemon", action="store_true",
+                   help="stay running: refresh ahead of each game window and serve the preview over HTTP")
+    p.add_argument("--incremental", action="store_true", default=os.getenv("MLB_INCREMENTAL", "0") == "1",
+                   help="reuse the last run's pitcher stats and narratives for games whose inputs did not change")
+    return p.parse_args(argv)
 
-    return {
-        "target_date": target_date_str,
-        "contender_games": contender_games,
-        "other_games": other_games,
-    }
 
-
-def main():
+def main(argv=None):
     load_dotenv()
+    args = parse_args(argv)
     log = get_logger("mlb.main")
+    replay.configure(record=args.record, replay=args.replay)
+    trace.configure(args.trace)
+    store.configure(read=args.from_store)
+
+    with trace.profiling(args.profile):
+        try:
+            if args.date_from or args.date_to:
+                from app.backfill import run_backfill
+                start = args.date_from or args.date_to
+                run_backfill(start, args.date_to or start, out_dir=args.out, workers=args.workers)
+            elif args.daemon:
+                from app.daemon import run_daemon
+                run_daemon(lambda: run_daily(log, editions_path=args.editions, incremental_run=True))
+            else:
+                run_daily(log, editions_path=args.editions, incremental_run=args.incremental)
+        finally:
+            trace.write()
+
+
+def run_daily(log, editions_path: str | None = None, incremental_run: bool = False) -> dict:
+    """
+    Build today's newsletter and send it (or write the preview).
+    Returns {"html", "games"} for callers that keep running (app.daemon).
+
+    With incremental_run, state from an earlier run for the same slate is
+    reused: pitcher stats are only fetched for new probables and games that
+    picked the same article keep their narrative. Such a refresh writes the
+    preview instead of re-sending, and with INCREMENTAL_NOTIFY=1 emails
+    only the lineup changes.
+    """
+
+    clear_teams()
 
     # Target dates
     target_myt_date, target_us_date = get_target_dates()
     log.info(f"Newsletter target (MYT): {target_myt_date}, mapped US date: {target_us_date}")
 
-    # 1) Standings / contenders
-    team_meta = fetch_team_meta(int(os.getenv("MLB_SEASON", "2025")))
+    season = int(os.getenv("MLB_SEASON", "2025"))
+    max_links = int(os.getenv("FLM_MAX_LINKS", "25"))
+    hours_window = int(os.getenv("FLM_HOURS_WINDOW", "36"))
+
+    state = None
+    if incremental_run and not replay.replaying():
+        state = incremental.load_state(target_us_date.isoformat())
+        log.info("Incremental: " + ("refreshing the last run" if state else "no state for this slate, full run"))
+    known_stats = incremental.cached_pitcher_stats(state)
+    previous = incremental.previous_narratives(state)
+
+    def _pitcher_stats(sched):
+        ids = probable_pitcher_ids(sched)
+        missing = [i for i in ids if i not in known_stats]
+        log.info(f"Fetching pitcher stats for {len(missing)}/{len(ids)} probable starters…")
+        stats = {i: known_stats[i] for i in ids if i in known_stats}
+        stats.update(fetch_pitcher_stats(missing))
+        return stats
+
+    # Standings, schedule and the Reuters scrape are independent and run
+    # side by side; pitcher stats only need the schedule, and matching
+    # needs both the annotated games and the articles.
+    stages = [
+        # 1) Standings / contenders
+        Stage("team_meta", lambda: fetch_team_meta(season)),
+        # 2) Schedule (US slate mapped from MYT)
+        Stage("schedule", lambda: fetch_schedule_for_myt_date(target_us_date)),
+        # 3) Pitcher stats
+        Stage("pitcher_stats", _pitcher_stats, deps=("schedule",)),
+        # 4) Field Level Media scrape
+        Stage("flm_articles", lambda: fetch_flm_previews(max_articles=max_links, hours_window=hours_window)),
+        # Filter + annotate, then write ERA/WHIP into the game dicts
+        Stage(
+            "games",
+            lambda sched, meta, stats: apply_pitcher_stats(
+                filter_and_annotate_games(sched, meta, contender_only=False), stats
+            ),
+            deps=("schedule", "team_meta", "pitcher_stats"),
+        ),
+        # 5) Match & summarize (OpenAI optional)
+        Stage("matched", lambda games, arts: match_and_summarize(games, arts, previous=previous),
+              deps=("games", "flm_articles")),
+    ]
+    results, timings = run_stages(stages)
+
+    team_meta = results["team_meta"]
+    games = results["games"]
     contenders = sum(1 for v in team_meta.values() if v.get("is_contender"))
     log.info(f"Contenders flagged: {contenders}")
-
-    # 2) Schedule + filter+annotate
-    log.info("Fetching schedule (US slate mapped from MYT)…")
-    sched = fetch_schedule_for_myt_date(target_us_date)
-    games = filter_and_annotate_games(sched, team_meta, contender_only=False)
     log.info(f"Games after contender filter: {len(games)}")
+    log.info(f"Reuters FLM articles fetched: {len(results['flm_articles'])}")
+    log.info(f"Narratives matched: {results['matched']}/{len(games)}")
+    log.info("Stage timings: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    trace.add("games", len(games))
+    trace.add("articles", len(results["flm_articles"]))
+    trace.add("narratives_matched", results["matched"])
 
-    # 3) Pitcher stats
-    ids = {pid for g in games for pid in [g.get("probable_home_id"), g.get("probable_away_id")] if pid}
-    log.info(f"Fetching pitcher stats for {len(ids)} probable starters…")
-    stat_map = fetch_pitcher_stats(ids)
-
-    # Write stats into the exact keys the template expects
-    for g in games:
-        ph, pa = g.get("probable_home_id"), g.get("probable_away_id")
-        if ph:
-            g["home_era"]  = (stat_map.get(ph, {}) or {}).get("ERA")  or g.get("home_era")  or "—"
-            g["home_whip"] = (stat_map.get(ph, {}) or {}).get("WHIP") or g.get("home_whip") or "—"
-        if pa:
-            g["away_era"]  = (stat_map.get(pa, {}) or {}).get("ERA")  or g.get("away_era")  or "—"
-            g["away_whip"] = (stat_map.get(pa, {}) or {}).get("WHIP") or g.get("away_whip") or "—"
-
-
-    # 4) Field Level Media scrape
-    flm_articles = fetch_flm_previews(
-        max_articles=int(os.getenv("FLM_MAX_LINKS", "25")),
-        hours_window=int(os.getenv("FLM_HOURS_WINDOW", "36"))
-    )
-    log.info(f"Reuters FLM articles fetched: {len(flm_articles)}")
-
-    # 5) Match & summarize (OpenAI optional)
-    matched = match_and_summarize(games, flm_articles)
-    log.info(f"Narratives matched: {matched}/{len(games)}")
+    changes = incremental.diff_games(state, games)
+    if incremental_run and not replay.replaying():
+        if state:
+            incremental.log_changes(changes)
+        incremental.save_state(target_us_date.isoformat(), games, results["pitcher_stats"])
 
     # 6) Prepare email context expected by email.html
     ctx = prepare_email_context(games, target_myt_date)
 
     # 7) Render email
-    html = render_template("email.html", **ctx)
+    html = render_newsletter(ctx)
 
     # 8) Send (or write to file)
     to = os.getenv("NEWS_RECIPIENTS", "").strip()
-    if not to:
-        log.info("NEWS_RECIPIENTS not set – writing newsletter_preview.html")
+    if state:
+        log.info("Incremental refresh – writing newsletter_preview.html")
+        with open("newsletter_preview.html", "w", encoding="utf-8") as f:
+            f.write(html)
+        if changes and to and os.getenv("INCREMENTAL_NOTIFY", "0") == "1":
+            send_changes(log, changes, ctx["target_date"], to)
+    elif not to or replay.replaying():
+        log.info("NEWS_RECIPIENTS not set (or replaying) – writing newsletter_preview.html")
         with open("newsletter_preview.html", "w", encoding="utf-8") as f:
             f.write(html)
     else:
@@ -121,15 +200,66 @@ def main():
         log.info(f"SMTP_USER set? {'yes' if smtp_user else 'no'}")
         log.info(f"SMTP_PASS length: {len(smtp_pass) if smtp_pass else 0}")
 
+        from app.delivery import log_report
+
         log.info(f"Sending email to {len(recipients)} recipient(s)…")
-        send_email(
+        statuses = send_email(
             subject=f"MLB Contender Matchups — {target_myt_date.strftime('%a %d %b %Y')} (MYT)",
             html=html,
             recipients=recipients
         )
-        log.info("Email sent.")
+        delivered = log_report(statuses)
+        log.info(f"Email sent to {delivered}/{len(statuses)} recipient(s).")
+
+    # 9) Personalised editions (optional)
+    if editions_path:
+        send_editions(log, games, ctx["target_date"], editions_path, deliver=state is None)
+
+    return {"html": html, "games": games}
+
+
+def send_changes(log, changes: list[dict], target_date: str, to: str):
+    """Email the lineup-changes delta of an incremental refresh."""
+    from app.delivery import log_report
+
+    recipients = [e.strip() for e in to.split(",") if e.strip()]
+    html = render_template("changes.html", target_date=target_date, changes=changes)
+    log.info(f"Sending {len(changes)} lineup change(s) to {len(recipients)} recipient(s)…")
+    log_report(send_email(subject=f"MLB lineup changes — {target_date}", html=html, recipients=recipients))
+
 
+def send_editions(log, games, target_date: str, editions_path: str, deliver: bool = True):
+    """Render every edition from the same games; send those with recipients, preview the rest."""
+    from app.delivery import SmtpDelivery, log_report
+    from app.editions import load_editions, render_editions
 
+    editions = load_editions(editions_path)
+    rendered = render_editions(games, editions, target_date)
+    smtp = None
+    statuses = []
+    try:
+        for ed in editions:
+            html = rendered[ed.name]
+            if deliver and ed.recipients and not replay.replaying():
+                log.info(f"Sending edition {ed.name} to {len(ed.recipients)} recipient(s)…")
+                if smtp is None:
+                    smtp = SmtpDelivery.from_env()  # connects lazily; shared by every edition
+                statuses += send_email(
+                    subject=f"MLB Contender Matchups — {target_date} ({ed.name})",
+                    html=html,
+                    recipients=ed.recipients,
+                    smtp=smtp,
+                )
+            else:
+                path = f"newsletter_preview_{ed.name}.html"
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(html)
+                log.info(f"Edition {ed.name}: no recipients – wrote {path}")
+    finally:
+        if smtp is not None:
+            smtp.close()
+    if statuses:
+        log_report(statuses)
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,178 @@
+# tests/test_delivery.py
+# app.delivery against an in-process SMTP server (stdlib only):
+#   python -m unittest discover tests
+
+import socketserver
+import threading
+import unittest
+
+from app.delivery import SmtpDelivery
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Just enough ESMTP for smtplib: EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        srv = self.server
+        with srv.lock:
+            srv.connections += 1
+        self._reply("220 test ESMTP")
+        sender, rcpts = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode().rstrip("\r\n")
+            cmd = line[:4].upper()
+            if cmd == "EHLO":
+                self._reply("250-test")
+                self._reply("250 8BITMIME")
+            elif cmd == "HELO":
+                self._reply("250 test")
+            elif cmd == "MAIL":
+                sender, rcpts = line.split(":", 1)[1].strip().strip("<>"), []
+                self._reply("250 OK")
+            elif cmd == "RCPT":
+                addr = line.split(":", 1)[1].strip().strip("<>")
+                with srv.lock:
+                    srv.rcpt_attempts[addr] = srv.rcpt_attempts.get(addr, 0) + 1
+                    tries = srv.rcpt_attempts[addr]
+                if addr in srv.rejected:
+                    self._reply("550 No such user")
+                elif tries <= srv.transient.get(addr, 0):
+                    self._reply("451 Try again later")
+                else:
+                    rcpts.append(addr)
+                    self._reply("250 OK")
+            elif cmd == "DATA":
+                if not rcpts:
+                    self._reply("503 No valid recipients")
+                    continue
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline().decode()
+                    if data in (".\r\n", ".\n", ""):
+                        break
+                    lines.append(data)
+                with srv.lock:
+                    srv.envelopes.append({"from": sender, "rcpts": list(rcpts), "data": "".join(lines)})
+                self._reply("250 Queued")
+            elif cmd == "RSET":
+                sender, rcpts = None, []
+                self._reply("250 OK")
+            elif cmd == "NOOP":
+                self._reply("250 OK")
+            elif cmd == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.envelopes: list[dict] = []
+        self.rcpt_attempts: dict[str, int] = {}
+        self.rejected: set[str] = set()
+        self.transient: dict[str, int] = {}   # address -> number of 451 replies before accepting
+
+
+class SmtpDeliveryTest(unittest.TestCase):
+    def setUp(self):
+        self.server = _Server()
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _delivery(self, **kw) -> SmtpDelivery:
+        kw.setdefault("retry_backoff", 0)
+        return SmtpDelivery(
+            "127.0.0.1", self.server.server_address[1], sender="news@example.com", starttls=False, **kw
+        )
+
+    def test_bulk_send_batches_envelopes_over_one_connection(self):
+        rcpts = [f"r{i}@example.com" for i in range(5)]
+        with self._delivery(envelope_size=2) as smtp:
+            statuses = smtp.send_bulk("Subject", "<p>hi</p>", rcpts)
+
+        self.assertEqual([len(e["rcpts"]) for e in self.server.envelopes], [2, 2, 1])
+        self.assertEqual([r for e in self.server.envelopes for r in e["rcpts"]], rcpts)
+        self.assertEqual(self.server.connections, 1)
+        self.assertTrue(all(s.ok and s.code == 250 and s.attempts == 1 for s in statuses))
+
+    def test_reconnects_after_max_per_connection(self):
+        rcpts = [f"r{i}@example.com" for i in range(4)]
+        with self._delivery(envelope_size=1, max_per_connection=2) as smtp:
+            smtp.send_bulk("Subject", "<p>hi</p>", rcpts)
+        self.assertEqual(len(self.server.envelopes), 4)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_bulk_send_uses_undisclosed_to_header(self):
+        rcpts = ["alice@example.com", "bob@example.com"]
+        with self._delivery() as smtp:
+            smtp.send_bulk("Subject", "<p>hi</p>", rcpts)
+
+        data = self.server.envelopes[0]["data"]
+        headers = data.replace("\r\n", "\n").split("\n\n", 1)[0]
+        self.assertIn("To: undisclosed-recipients:;", headers)
+        for r in rcpts:
+            self.assertNotIn(r, data)
+
+    def test_transient_failure_is_retried(self):
+        self.server.transient["flaky@example.com"] = 1
+        with self._delivery(retries=3) as smtp:
+            statuses = {s.recipient: s for s in smtp.send_bulk("S", "<p>x</p>", ["ok@example.com", "flaky@example.com"])}
+
+        self.assertTrue(statuses["ok@example.com"].ok)
+        self.assertEqual(statuses["ok@example.com"].attempts, 1)
+        self.assertTrue(statuses["flaky@example.com"].ok)
+        self.assertEqual(statuses["flaky@example.com"].attempts, 2)
+        # the retry envelope only carries the recipient that was deferred
+        self.assertEqual([e["rcpts"] for e in self.server.envelopes], [["ok@example.com"], ["flaky@example.com"]])
+
+    def test_transient_failure_gives_up_after_retries(self):
+        self.server.transient["down@example.com"] = 10
+        with self._delivery(retries=2) as smtp:
+            (status,) = smtp.send_bulk("S", "<p>x</p>", ["down@example.com"])
+        self.assertFalse(status.ok)
+        self.assertEqual((status.code, status.attempts), (451, 2))
+
+    def test_status_per_recipient(self):
+        self.server.rejected.add("bad@example.com")
+        with self._delivery(retries=3) as smtp:
+            statuses = {s.recipient: s for s in smtp.send_bulk("S", "<p>x</p>", ["a@example.com", "bad@example.com"])}
+
+        self.assertTrue(statuses["a@example.com"].ok)
+        bad = statuses["bad@example.com"]
+        self.assertFalse(bad.ok)
+        self.assertEqual(bad.code, 550)
+        self.assertIn("No such user", bad.error)
+        self.assertEqual(bad.attempts, 1)  # permanent failures are not retried
+
+    def test_personalised_messages_share_the_connection(self):
+        from app.delivery import Message
+
+        msgs = [Message(f"u{i}@example.com", f"Hi {i}", f"<p>{i}</p>") for i in range(3)]
+        with self._delivery() as smtp:
+            statuses = smtp.send(msgs)
+
+        self.assertTrue(all(s.ok for s in statuses))
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual([e["rcpts"] for e in self.server.envelopes], [[m.recipient] for m in msgs])
+        self.assertIn("To: u0@example.com", self.server.envelopes[0]["data"])
+
+
+if __name__ == "__main__":
+    unittest.main()
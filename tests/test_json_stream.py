@@ -0,0 +1,87 @@
+# tests/test_json_stream.py
+# The incremental schedule reader against json.loads, at every chunk size:
+#   python -m unittest discover tests
+
+import json
+import unittest
+
+from app.json_stream import iter_schedule_games, text_chunks
+
+
+def _game(pk: int, **extra) -> dict:
+    return {
+        "gamePk": pk,
+        "gameDate": "2025-06-01T23:05:00Z",
+        "teams": {"away": {"team": {"id": 147, "name": "New York Yankees"}, "leagueRecord": {"pct": ".625"}},
+                  "home": {"team": {"id": 111, "name": "Boston Red Sox"}, "score": 0}},
+        "venue": {"name": 'Fenway Park "the {old} lady" \\ [1912]'},
+        **extra,
+    }
+
+
+def _reference(payload: dict) -> list[tuple]:
+    out = []
+    for block in payload.get("dates", []):
+        out += [(block.get("date"), g) for g in block.get("games", [])]
+    return out
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class ScheduleStreamTest(unittest.TestCase):
+    def _check(self, text: str, expected: list[tuple]):
+        for size in range(1, 40):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(list(iter_schedule_games(_chunks(text, size))), expected)
+
+    def test_matches_json_loads(self):
+        payload = {
+            "copyright": "Copyright 2025 MLB Advanced Media, L.P.",
+            "totalGames": 3,
+            "dates": [
+                {"date": "2025-06-01", "totalGames": 2, "games": [_game(1), _game(2, seriesGameNumber=3)]},
+                {"date": "2025-06-02", "totalGames": 0, "games": []},
+                {"date": "2025-06-03", "totalGames": 1, "games": [_game(3, note=None, delayed=False)]},
+            ],
+            "wait": 10,
+        }
+        for text in (json.dumps(payload), json.dumps(payload, indent=2)):
+            self._check(text, _reference(payload))
+
+    def test_games_before_date(self):
+        text = '{"dates": [{"games": [%s, %s], "totalGames": 2, "date": "2025-06-01"}]}' % (
+            json.dumps(_game(1)), json.dumps(_game(2)),
+        )
+        self._check(text, [("2025-06-01", _game(1)), ("2025-06-01", _game(2))])
+
+    def test_numbers_split_across_chunks(self):
+        payload = {"dates": [{"date": "2025-06-01", "games": [
+            {"gamePk": 777123456, "odds": -1.25e3, "ratio": 0.3333333333, "big": 12345678901234567890},
+        ]}]}
+        text = json.dumps(payload, separators=(",", ":"))
+        self._check(text, _reference(payload))
+        # a number that ends exactly where a chunk ends
+        self.assertEqual(list(iter_schedule_games(['{"dates":[{"date":"d","games":[{"gamePk":12', '34}]}]}'])),
+                         [("d", {"gamePk": 1234})])
+
+    def test_empty_and_missing_dates(self):
+        self._check('{"dates": []}', [])
+        self._check('{"totalGames": 0}', [])
+        self._check("{}", [])
+
+    def test_in_memory_bodies_use_the_same_reader(self):
+        payload = {"dates": [{"date": "2025-06-01", "games": [_game(1), _game(2)]}]}
+        text = json.dumps(payload)
+        self.assertEqual(list(iter_schedule_games(text_chunks(text, size=7))), _reference(payload))
+
+    def test_malformed_input_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_schedule_games(['{"dates": [{"date": "d", "games": [{"gamePk": 1}'], ))
+        with self.assertRaises(ValueError):
+            list(iter_schedule_games(['{"dates" [] }']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+# tests/test_narrative_batch.py
+# Batched OpenAI summaries: every malformed or failed reply falls back per
+# game to _summarize_text, and only real batch answers are cached:
+#   python -m unittest discover tests
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app import narrative, summary_cache
+from app.models import Game, Team
+
+BODY = (
+    "The New York Yankees visit the Boston Red Sox on Tuesday night.\n\n"
+    "Gerrit Cole carries a 2.95 ERA into the start against the Red Sox."
+)
+
+
+def _pick(pk: int) -> tuple:
+    game = Game(
+        pk, "2025-06-01T23:05:00Z", "7:05 AM MYT",
+        home=Team(111, "Boston Red Sox", "30-28"), away=Team(147, "New York Yankees", "35-22"),
+        home_pitcher="Brayan Bello", away_pitcher="Gerrit Cole",
+    )
+    article = {
+        "title": f"Yankees at Red Sox: preview {pk}", "url": f"https://www.reuters.com/sports/baseball/p-{pk}/",
+        "body": BODY, "t1": "New York Yankees", "t2": "Boston Red Sox",
+    }
+    return game, article
+
+
+class BatchFallbackTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.batch_keys: list[str] = []
+        make_key = summary_cache.make_key
+
+        def recording_make_key(model, version, *args):
+            key = make_key(model, version, *args)
+            if version == narrative.BATCH_PROMPT_VERSION:
+                self.batch_keys.append(key)
+            return key
+
+        patches = [
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"}),
+            mock.patch.object(summary_cache, "CACHE_PATH", os.path.join(tmp.name, "summaries.sqlite")),
+            mock.patch.object(summary_cache, "CACHE_ENABLED", True),
+            mock.patch.object(summary_cache, "_conn", None),
+            mock.patch.object(summary_cache, "make_key", recording_make_key),
+            mock.patch.object(narrative, "_chat_text", self._chat_text),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(lambda: summary_cache._conn and summary_cache._conn.close())
+        self.batch_reply = None
+        self.single_calls = 0
+
+    def _chat_text(self, model, messages, **kw):
+        if "response_format" in kw:
+            if isinstance(self.batch_reply, Exception):
+                raise self.batch_reply
+            return self.batch_reply
+        self.single_calls += 1
+        return f"Single-game preview {self.single_calls}."
+
+    def _run(self, reply, pks=(1, 2)) -> list[str]:
+        self.batch_reply = reply
+        return narrative._summarize_batch([_pick(pk) for pk in pks])
+
+    def _assert_fell_back(self, out: list[str], games: list[int]):
+        for idx in games:
+            self.assertTrue(out[idx].startswith("Single-game preview"), out[idx])
+            self.assertIsNone(summary_cache.get(self.batch_keys[idx]))
+        self.assertEqual(self.single_calls, len(games))
+
+    def test_all_answered(self):
+        out = self._run(json.dumps({"1": "Cole faces Boston.", "2": "Bello hosts New York."}))
+        self.assertEqual(out, ["Cole faces Boston.", "Bello hosts New York."])
+        self.assertEqual(self.single_calls, 0)
+        self.assertEqual(summary_cache.get(self.batch_keys[0]), "Cole faces Boston.")
+
+    def test_reply_missing_a_game(self):
+        out = self._run(json.dumps({"1": "Cole faces Boston."}))
+        self.assertEqual(out[0], "Cole faces Boston.")
+        self.assertEqual(summary_cache.get(self.batch_keys[0]), "Cole faces Boston.")
+        self._assert_fell_back(out, [1])
+
+    def test_non_string_value(self):
+        out = self._run(json.dumps({"1": "Cole faces Boston.", "2": {"preview": "nested"}}))
+        self.assertEqual(out[0], "Cole faces Boston.")
+        self._assert_fell_back(out, [1])
+
+    def test_reply_not_a_json_object(self):
+        replies = (json.dumps(["Cole faces Boston.", "Bello hosts New York."]), "Sure! Here are your previews")
+        for n, reply in enumerate(replies):
+            with self.subTest(reply=reply):
+                self.batch_keys.clear()
+                self.single_calls = 0
+                out = self._run(reply, pks=(10 * n + 1, 10 * n + 2))
+                self._assert_fell_back(out, [0, 1])
+
+    def test_request_raises(self):
+        out = self._run(TimeoutError("read timed out"))
+        self._assert_fell_back(out, [0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
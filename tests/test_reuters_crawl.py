@@ -0,0 +1,99 @@
+# tests/test_reuters_crawl.py
+# Author-page crawl and its cursor, against canned pages:
+#   python -m unittest discover tests
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from app import reuters_flm
+from app.reuters_flm import AUTHOR_URL, crawl_flm
+
+NOW = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _card(n: int) -> dict:
+    ts = (NOW - timedelta(minutes=10 * n)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {"url": f"https://www.reuters.com/sports/baseball/story-{n}/", "datetime": ts, "n": n}
+
+
+def _page_html(cards: list[dict]) -> str:
+    lis = "".join(
+        f'<li data-testid="StoryCard"><a data-testid="TitleLink" href="{c["url"][len("https://www.reuters.com"):]}">'
+        f'<span data-testid="TitleHeading">Story {c["n"]}</span></a>'
+        f'<time datetime="{c["datetime"]}">t</time><p data-testid="Description">d</p></li>'
+        for c in cards
+    )
+    return f"<html><body><ul>{lis}</ul></body></html>"
+
+
+def _page_url(page: int) -> str:
+    return AUTHOR_URL if page == 1 else f"{AUTHOR_URL}?page={page}"
+
+
+class _Site:
+    """Author pages of `per_page` cards over story numbers `first`..`last` (newest first)."""
+
+    def __init__(self, first: int, last: int, per_page: int = 3):
+        self.cards = [_card(n) for n in range(first, last + 1)]
+        self.per_page = per_page
+        self.fetched: list[str] = []
+        self.broken: set[str] = set()
+
+    def fetch(self, url: str = AUTHOR_URL) -> str:
+        self.fetched.append(url)
+        if url in self.broken:
+            raise RuntimeError("503 Service Unavailable")
+        page = 1 if url == AUTHOR_URL else int(url.rsplit("=", 1)[1])
+        return _page_html(self.cards[(page - 1) * self.per_page:page * self.per_page])
+
+
+def _run(site: _Site, cursor: dict, max_pages: int) -> list[int]:
+    """One crawl plus the cursor update fetch_flm_previews makes; returns the new story numbers."""
+    with mock.patch.object(reuters_flm, "_fetch_author_page", site.fetch):
+        new = crawl_flm(cursor, NOW - timedelta(days=2), max_pages=max_pages)
+    cursor["seen"].update({c["url"]: c for c in new})
+    return [int(c["url"].rstrip("/").rsplit("-", 1)[1]) for c in new]
+
+
+class CrawlResumeTest(unittest.TestCase):
+    def setUp(self):
+        # An earlier run already processed stories 22-25 and set the high-water mark
+        self.cursor = {"high_water": _card(22)["datetime"], "seen": {}, "resume": None}
+        self.cursor["seen"] = {c["url"]: c for c in (_card(n) for n in range(22, 26))}
+
+    def test_full_walk_advances_high_water(self):
+        site = _Site(3, 25)
+        self.assertEqual(_run(site, self.cursor, max_pages=10), list(range(3, 22)))
+        self.assertIsNone(self.cursor["resume"])
+        self.assertEqual(self.cursor["high_water"], reuters_flm._parse_ts(_card(3)["datetime"]).isoformat())
+
+    def test_truncated_walk_is_resumed_next_run(self):
+        site = _Site(3, 25)
+        self.assertEqual(_run(site, self.cursor, max_pages=2), list(range(3, 9)))
+        self.assertEqual(self.cursor["resume"], {"url": _page_url(3), "page": 3})
+        self.assertEqual(self.cursor["high_water"], _card(22)["datetime"])
+
+        # Two more stories were published since, so every page shifted down by two cards
+        site = _Site(1, 25)
+        got = _run(site, self.cursor, max_pages=10)
+        self.assertEqual(site.fetched[:2], [AUTHOR_URL, _page_url(3)])
+        self.assertEqual(got, [1, 2] + list(range(9, 22)))
+        self.assertIsNone(self.cursor["resume"])
+        self.assertEqual(self.cursor["high_water"], reuters_flm._parse_ts(_card(1)["datetime"]).isoformat())
+
+    def test_failing_deeper_page_is_retried_next_run(self):
+        site = _Site(1, 25)
+        site.broken.add(_page_url(2))
+        self.assertEqual(_run(site, self.cursor, max_pages=5), [1, 2, 3])
+        self.assertEqual(self.cursor["resume"], {"url": _page_url(2), "page": 2})
+
+        site.broken.clear()
+        site.fetched.clear()
+        self.assertEqual(_run(site, self.cursor, max_pages=10), list(range(4, 22)))
+        self.assertEqual(site.fetched[:2], [AUTHOR_URL, _page_url(2)])
+        self.assertIsNone(self.cursor["resume"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# tests/test_schedule.py
+# Streaming schedule slates in read-from-store mode, against a temporary store:
+#   python -m unittest discover tests
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+from app import schedule, store
+
+
+def _block(day: str, *pks: int) -> dict:
+    return {"date": day, "games": [
+        {"gamePk": pk, "gameDate": f"{day}T23:05:00Z", "teams": {"home": {"team": {"id": 111}}, "away": {"team": {"id": 147}}}}
+        for pk in pks
+    ]}
+
+
+class StoreSlatesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patches = [
+            mock.patch.object(store, "STORE_PATH", os.path.join(self.tmp.name, "mlb.sqlite")),
+            mock.patch.object(store, "STORE_ENABLED", True),
+            mock.patch.object(store, "_conn", None),
+            mock.patch.object(store, "_read", True),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(lambda: store._conn and store._conn.close())
+
+        # Earlier runs fetched June 1-2 and June 6-7
+        for day, pk in (("2025-06-01", 1), ("2025-06-02", 2), ("2025-06-06", 6), ("2025-06-07", 7)):
+            store.save_schedule({"dates": [_block(day, pk)]})
+            store.mark_schedule_days(date.fromisoformat(day), date.fromisoformat(day))
+
+    def _serve(self, payload: dict):
+        self.requests = []
+
+        def fake_iter_text(url, params=None, **kw):
+            self.requests.append(params)
+            yield json.dumps(payload)
+        return mock.patch.object(schedule, "iter_text", fake_iter_text)
+
+    def test_stored_slates_surround_the_fetched_span_in_date_order(self):
+        fetched = {"dates": [_block("2025-06-03", 3), _block("2025-06-04", 4), _block("2025-06-05", 5)]}
+        with self._serve(fetched):
+            slates = [(day, [g["gamePk"] for g in games])
+                      for day, games in schedule.iter_schedule_slates(date(2025, 6, 1), date(2025, 6, 7))]
+
+        self.assertEqual(slates, [(f"2025-06-0{d}", [d]) for d in range(1, 8)])
+        self.assertEqual([(p["startDate"], p["endDate"]) for p in self.requests], [("2025-06-03", "2025-06-05")])
+        self.assertEqual(store.missing_schedule_days(date(2025, 6, 1), date(2025, 6, 7)), [])
+
+    def test_fully_stored_range_makes_no_request(self):
+        with self._serve({"dates": []}):
+            slates = [day for day, _ in schedule.iter_schedule_slates(date(2025, 6, 6), date(2025, 6, 7))]
+        self.assertEqual(slates, ["2025-06-06", "2025-06-07"])
+        self.assertEqual(self.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# tests/test_team_index.py
+# The one-regex alias index against the per-team, per-alias scan it replaced:
+#   python -m unittest discover tests
+
+import re
+import unittest
+
+from app.narrative import _top_two_teams
+from app.team_index import count_mentions, mentioned_teams, resolve_team, team_pairs
+from app.teams import FULL_TO_ALIASES, TEAMS
+
+
+def _old_count_mentions(text: str) -> dict[str, int]:
+    """The original narrative._count_mentions: one regex per alias, every alias scanned."""
+    counts = {t["full"]: 0 for t in TEAMS}
+    for full, aliases in FULL_TO_ALIASES.items():
+        for alias in aliases:
+            escaped = re.escape(alias).replace(r"\ ", r"\s+")
+            counts[full] += len(re.findall(rf"(?<!\w){escaped}(?!\w)", text.lower(), re.I))
+    return counts
+
+
+def _old_top_two(title: str, paras: str) -> tuple:
+    ranked = sorted(_old_count_mentions(" ".join([title, paras])).items(), key=lambda kv: kv[1], reverse=True)
+    ranked = [x for x in ranked if x[1] > 0]
+    return tuple(x[0] for x in ranked[:2]) + (None,) * (2 - len(ranked[:2]))
+
+
+# (title, first two paragraphs) shaped like Field Level Media previews
+ARTICLES = [
+    ("Yankees at Red Sox: preview", "The Yankees open a series at Fenway. The Red Sox have won three straight."),
+    ("Cardinals, Cubs meet in rubber game", "St. Louis and Chicago split the first two. The Cubs start a lefty."),
+    ("St. Louis Cardinals host Chicago Cubs", "The Cardinals send their ace to the mound against the Cubs."),
+    ("White Sox try to snap skid vs. Red Sox", "Chicago has lost six in a row. The Sox bullpen is taxed."),
+    ("D-backs look to sweep Giants", "Arizona has won five of six. San Francisco Giants slugger returns."),
+    ("Astros host Rangers as Valdez seeks bounce-back", "Houston was swept in Seattle. The Rangers lead the division."),
+    ("Nats try to stop skid vs. Mets", "Washington was held to one run. The Mets start their ace."),
+    ("A's at Mariners", "The Athletics and Mariners meet for the first time this season."),
+    ("Blue Jays, Rays open key series", "Toronto trails Tampa Bay by two games. The Jays have the edge."),
+    ("Twins visit Royals", "Minnesota has won seven in a row. Kansas City counters with a rookie."),
+]
+
+
+class MentionCountTest(unittest.TestCase):
+    def test_counts_match_the_old_scan(self):
+        for title, paras in ARTICLES:
+            text = f"{title} {paras}"
+            with self.subTest(title=title):
+                self.assertEqual(count_mentions(text), _old_count_mentions(text))
+
+    def test_top_two_match_the_old_scan(self):
+        for title, paras in ARTICLES:
+            with self.subTest(title=title):
+                self.assertEqual(_top_two_teams(title, paras), _old_top_two(title, paras))
+
+    def test_nested_aliases_count_for_each_team(self):
+        counts = count_mentions("St. Louis Cardinals")
+        self.assertEqual(counts["St. Louis Cardinals"], 3)  # full name, "st. louis", "cardinals"
+
+
+class TitlePairTest(unittest.TestCase):
+    def _pair(self, title: str) -> set:
+        return mentioned_teams(title, abbreviations=False)
+
+    def test_nicknames_only(self):
+        self.assertEqual(self._pair("Yankees at Red Sox: preview"), {"New York Yankees", "Boston Red Sox"})
+        self.assertEqual(self._pair("Nats try to stop skid vs. Mets"), {"Washington Nationals", "New York Mets"})
+        self.assertEqual(self._pair("A's at Mariners"), {"Oakland Athletics", "Seattle Mariners"})
+
+    def test_city_and_nickname(self):
+        self.assertEqual(
+            self._pair("St. Louis Cardinals host Chicago Cubs"), {"St. Louis Cardinals", "Chicago Cubs"}
+        )
+        self.assertEqual(team_pairs(self._pair("Tampa Bay Rays at Toronto Blue Jays")),
+                         [frozenset({"Tampa Bay Rays", "Toronto Blue Jays"})])
+
+    def test_nested_sox(self):
+        self.assertEqual(self._pair("White Sox try to snap skid vs. Red Sox"),
+                         {"Chicago White Sox", "Boston Red Sox"})
+        self.assertEqual(self._pair("Sox rally late"), set())
+
+    def test_abbreviations_do_not_match(self):
+        for title, teams in [
+            ("Astros host Rangers as Valdez seeks bounce-back", {"Houston Astros", "Texas Rangers"}),
+            ("Braves win as rain was in the forecast", {"Atlanta Braves"}),
+            ("Padres take min risk with sea of injuries", {"San Diego Padres"}),
+            ("Rockies col top pick debuts", {"Colorado Rockies"}),
+        ]:
+            with self.subTest(title=title):
+                self.assertEqual(self._pair(title), teams)
+        # ...but the plain index still knows them
+        self.assertIn("Oakland Athletics", mentioned_teams("Astros host Rangers as Valdez seeks bounce-back"))
+
+    def test_full_names_only(self):
+        self.assertEqual(mentioned_teams("Cubs at St. Louis Cardinals", full_names_only=True), {"St. Louis Cardinals"})
+
+
+class ResolveTeamTest(unittest.TestCase):
+    def test_statsapi_names(self):
+        for t in TEAMS:
+            self.assertEqual(resolve_team(t["full"]), t["full"])
+        self.assertEqual(resolve_team("Athletics"), "Oakland Athletics")
+        self.assertIsNone(resolve_team("St. Louis"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# tests/test_trace.py
+# --profile must see the pipeline stages, which run on a thread pool:
+#   python -m unittest discover tests
+
+import os
+import pstats
+import tempfile
+import unittest
+
+from app import trace
+from app.stages import Stage, run_stages
+
+
+def _busy_stage():
+    return sum(i * i for i in range(20000))
+
+
+def _dependent_stage(x):
+    return x + 1
+
+
+class ProfilingTest(unittest.TestCase):
+    def test_stage_threads_are_in_the_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.prof")
+            with trace.profiling(path):
+                results, _ = run_stages([
+                    Stage("busy", _busy_stage),
+                    Stage("dependent", _dependent_stage, ("busy",)),
+                ])
+            funcs = {name for _, _, name in pstats.Stats(path).stats}
+
+        self.assertEqual(results["dependent"], _busy_stage() + 1)
+        self.assertIn("_busy_stage", funcs)
+        self.assertIn("_dependent_stage", funcs)
+
+    def test_profiled_is_a_no_op_without_profiling(self):
+        with trace.profiled():
+            pass
+        self.assertIsNone(trace._profiles)
+
+
+if __name__ == "__main__":
+    unittest.main()